@@ -1,148 +1,307 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request
 from flask_cors import CORS
+import errno
+import functools
+import hashlib
 import logging
 import os
-import traceback
-import socket
+import re
+import shutil
 import sys
+import threading
 import numpy as np
+import orjson
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
+from config import Config
+from logging_setup import setup_logging, stop_logging
 
-def sanitize_for_json(obj):
-    """Convert numpy types to native Python types for JSON serialization"""
-    if isinstance(obj, (np.integer, np.int64, np.int32)):
+def json_default(obj):
+    """orjson fallback hook: only called for values orjson cannot encode itself"""
+    if isinstance(obj, np.integer):
         return int(obj)
-    elif isinstance(obj, (np.floating, np.float64, np.float32)):
+    elif isinstance(obj, np.floating):
         return float(obj)
+    elif isinstance(obj, np.bool_):
+        return bool(obj)
     elif isinstance(obj, np.ndarray):
         return obj.tolist()
-    elif isinstance(obj, dict):
-        return {key: sanitize_for_json(value) for key, value in obj.items()}
-    elif isinstance(obj, (list, tuple)):
-        return [sanitize_for_json(item) for item in obj]
-    return obj
-
-# Fix Windows Unicode logging issues
-if sys.platform == "win32":
-    import codecs
-    sys.stdout = codecs.getwriter("utf-8")(sys.stdout.detach())
-    sys.stderr = codecs.getwriter("utf-8")(sys.stderr.detach())
-
-# Enhanced configuration - Windows compatible logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('ai_service.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_json(obj):
+    """Serialize obj to JSON bytes with orjson (numpy types handled natively)"""
+    return orjson.dumps(obj, default=json_default,
+                        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+def orjson_response(obj, status=200):
+    """Serialize obj with orjson into a Flask response"""
+    return app.response_class(dumps_json(obj), status=status, mimetype='application/json')
+
+STREAM_PAGE_SIZE = 256
+
+def to_columnar(records):
+    """Transpose a list of same-keyed dicts into a dict of parallel lists"""
+    if not records:
+        return {}
+    return {key: [record[key] for record in records] for key in records[0]}
+
+def stream_prediction_response(prediction, daily_pages):
+    """Stream {'success': True, 'data': prediction} with daily_predictions appended
+    page by page, so the whole serialized list is never held in memory"""
+    def generate():
+        head = dumps_json({'success': True, 'data': prediction})
+        yield head[:-2] + b',"daily_predictions":['
+        first = True
+        for page in daily_pages:
+            if not page:
+                continue
+            yield (b'' if first else b',') + dumps_json(page)[1:-1]
+            first = False
+        yield b']}}'
+    
+    return app.response_class(generate(), mimetype='application/json')
+
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Enhanced CORS configuration
+# Enhanced CORS configuration - explicit allowlist, preflights cached by browsers for 24h
 CORS(app, 
-     origins=["*"], 
+     origins=Config.CORS_ORIGINS, 
      methods=["GET", "POST", "OPTIONS"], 
      allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
-     supports_credentials=True)
+     supports_credentials=True,
+     automatic_options=True,
+     max_age=86400)
 
-# Global model instances
+# Global model instances (materialized lazily by the accessors below)
 recommendation_model = None
 planning_model = None
+_planning_model_loaded = False
+_rec_lock = threading.Lock()
+_plan_lock = threading.Lock()
+
+def _load_recommendation_model():
+    """Build the enhanced recommendation model, falling back to the basic one"""
+    try:
+        from models.recommendation_model import RecommendationModel
+        model = RecommendationModel()
+        
+        if model.initialize():
+            logger.info("Enhanced recommendation model loaded successfully")
+            logger.info(f"Model info: {model.get_model_info()}")
+            return model
+        raise Exception("Enhanced recommendation model initialization failed")
+            
+    except Exception as e:
+        logger.error(f"Enhanced recommendation model failed: {e}")
+        logger.info("Falling back to basic recommendation model")
+        return FallbackRecommendationModel()
+
+def _load_planning_model():
+    """Build and train the enhanced planning model, None if training fails"""
+    try:
+        from models.planning_model import PlanningModel
+        model = PlanningModel()
+        
+        if model.load_and_train():
+            logger.info("Enhanced planning model loaded and trained successfully")
+            logger.info(f"Model performance: Accuracy={model.accuracy:.3f}, MAE={model.mae:.3f}")
+            return model
+        logger.warning("Enhanced planning model training failed")
+        
+    except Exception as e:
+        logger.exception(f"Enhanced planning model failed: {e}")
+    return None
 
-def initialize_models():
-    """Enhanced model initialization with better error handling"""
-    global recommendation_model, planning_model
+# Capabilities resolved once per loaded model, so handlers skip getattr/hasattr probes
+_rec_info = {'loaded': False, 'initialized': False, 'get_info': None, 'get_stats': None}
+_plan_info = {'loaded': False, 'trained': False, 'get_info': None}
+
+def _set_recommendation_model(model):
+    global recommendation_model
+    recommendation_model = model
+    _rec_info.update(
+        loaded=model is not None,
+        initialized=getattr(model, 'is_initialized', False),
+        get_info=getattr(model, 'get_model_info', None),
+        get_stats=getattr(model, 'get_equipment_stats', None)
+    )
+    invalidate_response_cache()
+
+def _set_planning_model(model):
+    global planning_model, _planning_model_loaded
+    planning_model = model
+    _planning_model_loaded = True
+    _plan_info.update(
+        loaded=model is not None,
+        trained=getattr(model, 'is_trained', False),
+        get_info=getattr(model, 'get_model_info', None)
+    )
+    invalidate_response_cache()
+
+def get_recommendation_model():
+    """Return the recommendation model, initializing it on first use"""
+    if recommendation_model is None:
+        with _rec_lock:
+            if recommendation_model is None:
+                _set_recommendation_model(_load_recommendation_model())
+    return recommendation_model
+
+def get_planning_model():
+    """Return the trained planning model (or None), training it on first use"""
+    if not _planning_model_loaded:
+        with _plan_lock:
+            if not _planning_model_loaded:
+                _set_planning_model(_load_planning_model())
+    return planning_model
+
+def initialize_models(eager=None):
+    """Start model initialization.
+    
+    With eager=True (or AI_EAGER_INIT=1) both models are loaded, side by side
+    in two threads, before returning.
+    Otherwise the planning model trains in a background thread and the
+    recommendation model is loaded on its first request.
+    """
+    if eager is None:
+        eager = os.environ.get('AI_EAGER_INIT') == '1'
     
     try:
         logger.info("Starting Enhanced AI Service Initialization...")
         
-        # Initialize enhanced recommendation model
-        try:
-            from models.recommendation_model import RecommendationModel
-            recommendation_model = RecommendationModel()
-            
-            if recommendation_model.initialize():
-                logger.info("Enhanced recommendation model loaded successfully")
-                logger.info(f"Model info: {recommendation_model.get_model_info()}")
-            else:
-                raise Exception("Enhanced recommendation model initialization failed")
-                
-        except Exception as e:
-            logger.error(f"Enhanced recommendation model failed: {e}")
-            logger.info("Falling back to basic recommendation model")
-            recommendation_model = FallbackRecommendationModel()
-        
-        # Initialize enhanced planning model
-        try:
-            from models.planning_model import PlanningModel
-            planning_model = PlanningModel()
-            
-            if planning_model.load_and_train():
-                logger.info("Enhanced planning model loaded and trained successfully")
-                logger.info(f"Model performance: Accuracy={planning_model.accuracy:.3f}, MAE={planning_model.mae:.3f}")
-            else:
-                logger.warning("Enhanced planning model training failed")
-                planning_model = None
-                
-        except Exception as e:
-            logger.error(f"Enhanced planning model failed: {e}")
-            logger.error(traceback.format_exc())
-            planning_model = None
-        
-        logger.info("Enhanced AI Service initialization complete")
+        if eager:
+            # Mostly file reads and native code (torch, sklearn) that release the GIL
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix='model-init') as pool:
+                loaders = [pool.submit(get_recommendation_model), pool.submit(get_planning_model)]
+                for future in as_completed(loaders):
+                    future.result()
+            logger.info("Enhanced AI Service initialization complete")
+        else:
+            threading.Thread(target=get_planning_model, name='planning-model-init', daemon=True).start()
+            logger.info("Planning model training started in background, recommendation model loads on first use")
         return True
         
     except Exception as e:
-        logger.error(f"Critical error during model initialization: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"Critical error during model initialization: {e}")
         return False
 
+def prime_model_cache():
+    """Initialize both models in a throwaway child process so they are saved to disk
+    
+    Used before forking workers: a process that has run OpenMP code
+    (HistGradientBoosting, torch) hangs its forked children the first time they
+    run it again, so the parent only waits here and each worker then loads the
+    saved models itself. Returns True if the child initialized both models.
+    """
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            status = 0 if initialize_models(eager=True) else 1
+        finally:
+            stop_logging()
+            os._exit(status)
+    _, wait_status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(wait_status) == 0
+
+# Stale-while-revalidate cache of pre-serialized payloads for read-mostly GET endpoints
+_response_cache = {}
+_refreshing = set()
+_cache_lock = threading.Lock()
+# Bumped on every invalidation, so a payload built from the models as they
+# were before it is not stored afterwards
+_cache_generation = 0
+
+def invalidate_response_cache():
+    """Drop every cached payload (called whenever a model is set, loaded or reloaded)"""
+    global _cache_generation
+    with _cache_lock:
+        _response_cache.clear()
+        _cache_generation += 1
+
+def _store_cached_payload(key, builder):
+    """Build, serialize and cache builder()'s payload; returns it"""
+    generation = _cache_generation
+    payload = dumps_json(builder())
+    with _cache_lock:
+        if generation == _cache_generation:
+            _response_cache[key] = (time.monotonic() + Config.CACHE_TTL, payload)
+    return payload
+
+def _refresh_cached_payload(key, builder):
+    try:
+        _store_cached_payload(key, builder)
+    except Exception as e:
+        logger.error(f"Error refreshing cached payload {key}: {e}")
+    finally:
+        with _cache_lock:
+            _refreshing.discard(key)
+
+def cached_payload(key, builder):
+    """builder()'s serialized payload from cache; stale entries are returned
+    while a background thread rebuilds them"""
+    if not Config.ENABLE_CACHING:
+        return dumps_json(builder())
+    
+    entry = _response_cache.get(key)
+    if entry is None:
+        payload = _store_cached_payload(key, builder)
+    else:
+        expires_at, payload = entry
+        if expires_at <= time.monotonic():
+            with _cache_lock:
+                start_refresh = key not in _refreshing
+                _refreshing.add(key)
+            if start_refresh:
+                threading.Thread(target=_refresh_cached_payload, args=(key, builder), daemon=True).start()
+    
+    return payload
+
+def cached_response(key, builder):
+    """Serve builder()'s payload through cached_payload()"""
+    return app.response_class(cached_payload(key, builder), mimetype='application/json')
+
 class FallbackRecommendationModel:
+    WEDDING_PATTERN = re.compile('|'.join(map(re.escape, ['mariage', 'wedding', 'outdoor', 'extérieur', 'photo'])))
+    
+    WEDDING_TEMPLATE = {
+        'id': f"rec_{hashlib.blake2b(b'Canon R6', digest_size=6).hexdigest()}",
+        'type': 'wedding',
+        'budget': 'high',
+        'lieu': 'extérieur',
+        'camera': 'Canon R6',
+        'objectif': 'Canon 24-70mm f/2.8',
+        'lumieres': 'Aputure 300x',
+        'prix_jour': 450,
+        'score': 0.85,
+        'confidence': 'very_good'
+    }
+    
+    GENERAL_TEMPLATE = {
+        'id': f"rec_{hashlib.blake2b(b'Canon EOS R', digest_size=6).hexdigest()}",
+        'type': 'general',
+        'budget': 'medium',
+        'lieu': 'intérieur',
+        'camera': 'Canon EOS R',
+        'objectif': 'Canon 50mm f/1.8',
+        'lumieres': 'Aputure Amaran 100x',
+        'prix_jour': 320,
+        'score': 0.70,
+        'confidence': 'relevant'
+    }
+    
     def __init__(self):
         self.is_initialized = True
         logger.info("Fallback recommendation model initialized")
         
     def get_recommendations(self, query, days=1):
         logger.info(f"Using fallback recommendations for: '{query}'")
-        
-        query_lower = query.lower()
-        recommendations = []
-        
-        if any(word in query_lower for word in ['mariage', 'wedding', 'outdoor', 'extérieur', 'photo']):
-            recommendations = [
-                {
-                    'type': 'wedding',
-                    'budget': 'high',
-                    'lieu': 'extérieur',
-                    'camera': 'Canon R6',
-                    'objectif': 'Canon 24-70mm f/2.8',
-                    'lumieres': 'Aputure 300x',
-                    'prix_jour': 450,
-                    'prix_total': 450 * days,
-                    'duree': days,
-                    'score': 0.85,
-                    'confidence': 'very_good'
-                }
-            ]
-        else:
-            recommendations = [
-                {
-                    'type': 'general',
-                    'budget': 'medium',
-                    'lieu': 'intérieur',
-                    'camera': 'Canon EOS R',
-                    'objectif': 'Canon 50mm f/1.8',
-                    'lumieres': 'Aputure Amaran 100x',
-                    'prix_jour': 320,
-                    'prix_total': 320 * days,
-                    'duree': days,
-                    'score': 0.70,
-                    'confidence': 'relevant'
-                }
-            ]
+        days = int(days)
+        # Copied: the cached dict is shared between requests
+        recommendations = [dict(_fallback_recommendation(query.lower(), days))]
         
         return {
             'success': True,
@@ -166,124 +325,187 @@ class FallbackRecommendationModel:
             'version': '1.0_fallback'
         }
 
-@app.before_request
-def handle_preflight():
-    if request.method == "OPTIONS":
-        response = jsonify({'status': 'OK'})
-        response.headers.add("Access-Control-Allow-Origin", "*")
-        response.headers.add('Access-Control-Allow-Headers', "*")
-        response.headers.add('Access-Control-Allow-Methods', "*")
-        return response
+@functools.lru_cache(maxsize=512)
+def _fallback_recommendation(query_lower, days):
+    """Fallback recommendation for a lower-cased query and an int day count (memoized, don't mutate)"""
+    if FallbackRecommendationModel.WEDDING_PATTERN.search(query_lower):
+        template = FallbackRecommendationModel.WEDDING_TEMPLATE
+    else:
+        template = FallbackRecommendationModel.GENERAL_TEMPLATE
+    return dict(template, prix_total=template['prix_jour'] * days, duree=days)
+
+# Static payloads, serialized once at import
+ROOT_PAYLOAD = dumps_json({
+    'service': 'Enhanced AI Equipment Recommendation Service',
+    'status': 'running',
+    'version': '2.1.0',
+    'endpoints': {
+        'health': '/health',
+        'model_info': '/api/ai/model-info',
+        'recommendations': '/api/ai/recommend-equipment',
+        'predictions': '/api/ai/predict-demand',
+        'stats': '/api/ai/equipment-stats'
+    }
+})
+
+NOT_FOUND_PAYLOAD = dumps_json({
+    'success': False,
+    'message': 'Endpoint not found',
+    'available_endpoints': [
+        '/health',
+        '/api/ai/model-info',
+        '/api/ai/recommend-equipment',
+        '/api/ai/predict-demand',
+        '/api/ai/equipment-stats'
+    ]
+})
 
 @app.route('/', methods=['GET'])
 def root():
-    return jsonify({
-        'service': 'Enhanced AI Equipment Recommendation Service',
-        'status': 'running',
-        'version': '2.0.0',
-        'endpoints': {
-            'health': '/health',
-            'model_info': '/api/ai/model-info',
-            'recommendations': '/api/ai/recommend-equipment',
-            'predictions': '/api/ai/predict-demand',
-            'stats': '/api/ai/equipment-stats'
-        }
-    })
+    return app.response_class(ROOT_PAYLOAD, mimetype='application/json')
 
-@app.route('/health', methods=['GET'])
-def health_check():
+def _build_health():
     model_status = {
         'recommendation_model': {
-            'loaded': recommendation_model is not None,
-            'initialized': getattr(recommendation_model, 'is_initialized', False)
+            'loaded': _rec_info['loaded'],
+            'initialized': _rec_info['initialized']
         },
         'planning_model': {
-            'loaded': planning_model is not None,
-            'trained': getattr(planning_model, 'is_trained', False)
+            'loaded': _plan_info['loaded'],
+            'trained': _plan_info['trained']
         }
     }
     
-    return jsonify({
+    return {
         'status': 'OK',
         'service': 'Enhanced AI Service',
         'port': int(os.environ.get('AI_SERVICE_PORT', 5001)),
         'models': model_status,
-        'version': '2.0.0'
-    })
+        'version': '2.1.0'
+    }
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    # Never cached: it must report the models as they are right now
+    return orjson_response(_build_health())
+
+def _build_model_info():
+    info = {
+        'service_version': '2.0_enhanced',
+        'recommendation_model': None,
+        'planning_model': None
+    }
+    
+    # Get recommendation model info
+    if _rec_info['get_info']:
+        info['recommendation_model'] = _rec_info['get_info']()
+    
+    # Get planning model info
+    if _plan_info['get_info']:
+        info['planning_model'] = _plan_info['get_info']()
+    
+    return {
+        'success': True,
+        'data': info
+    }
 
 @app.route('/api/ai/model-info', methods=['GET'])
 def model_info():
     """FIXED: Added missing model-info endpoint"""
     try:
         logger.info("Model info request received")
-        
-        from datetime import datetime  # Add this import
-        
-        info = {
-            'service_version': '2.0_enhanced',
-            'recommendation_model': None,
-            'planning_model': None,
-            'timestamp': datetime.now().isoformat()  # FIXED: Use datetime instead of pd
-        }
-        
-        # Get recommendation model info
-        if recommendation_model and hasattr(recommendation_model, 'get_model_info'):
-            info['recommendation_model'] = sanitize_for_json(recommendation_model.get_model_info())
-        
-        # Get planning model info
-        if planning_model and hasattr(planning_model, 'get_model_info'):
-            info['planning_model'] = sanitize_for_json(planning_model.get_model_info())
-        
-        return jsonify({
-            'success': True,
-            'data': info
-        })
+        # The model part is cached; the timestamp is added to its data object per request
+        payload = cached_payload('model_info', _build_model_info)
+        timestamp = dumps_json(datetime.now().isoformat())  # FIXED: Use datetime instead of pd
+        return app.response_class(payload[:-2] + b',"timestamp":' + timestamp + b'}}',
+                                  mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Error in model_info: {e}")
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': str(e)
-        }), 500
+        }, 500)
 
-@app.route('/api/ai/predict-demand', methods=['POST', 'OPTIONS'])
+@functools.lru_cache(maxsize=256)
+def fallback_prediction_template(days, is_summer):
+    """Date-independent part of a fallback prediction, shared (read-only) between requests
+    
+    days must already be validated (at most Config.MAX_PREDICTION_DAYS).
+    """
+    base_demand = 3.2 if is_summer else 2.5
+    
+    return {
+        'summary': {
+            'average_demand': round(base_demand, 2),
+            'maximum_demand': int(base_demand * 1.5),
+            'minimum_demand': int(base_demand * 0.5),
+            'total_predicted_demand': int(base_demand * days),
+            'overall_confidence': 0.75
+        },
+        'recommendations': [
+            {
+                'type': 'fallback',
+                'message': 'Using simplified prediction model',
+                'priority': 'medium'
+            }
+        ],
+        'daily_demand': int(base_demand)
+    }
+
+@app.route('/api/ai/predict-demand', methods=['POST'])
 def predict_demand():
-    if request.method == 'OPTIONS':
-        return '', 200
-        
     try:
         logger.info("Enhanced demand prediction request received")
         
         data = request.get_json()
         if not data:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Request body is required'
-            }), 400
+            }, 400)
         
         material_id = data.get('material_id') or data.get('equipmentId')
         start_date = data.get('start_date') or data.get('startDate')
         end_date = data.get('end_date') or data.get('endDate')
+        # 'columnar' returns daily_predictions as parallel arrays instead of one object per day
+        columnar = data.get('daily_format') == 'columnar'
         
         logger.info(f"Prediction request - Material: {material_id}, Start: {start_date}, End: {end_date}")
         
         if not all([material_id, start_date, end_date]):
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Material ID, start date, and end date are required'
-            }), 400
+            }, 400)
         
-        if not planning_model or not planning_model.is_trained:
-            logger.info("Planning model not available, using fallback")
-            
-            from datetime import datetime, timedelta
+        try:
             start_dt = datetime.strptime(start_date, '%Y-%m-%d')
             end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-            days = (end_dt - start_dt).days + 1
+        except (TypeError, ValueError):
+            return orjson_response({
+                'success': False,
+                'message': 'Dates must use the YYYY-MM-DD format'
+            }, 400)
+        
+        days = (end_dt - start_dt).days + 1
+        if days < 1:
+            # The planning model refuses empty windows (ValueError), report it as a bad request
+            return orjson_response({
+                'success': False,
+                'message': 'End date must not be before start date'
+            }, 400)
+        if days > Config.MAX_PREDICTION_DAYS:
+            return orjson_response({
+                'success': False,
+                'message': f'Prediction window cannot exceed {Config.MAX_PREDICTION_DAYS} days'
+            }, 400)
+        
+        planning_model = get_planning_model()
+        if not planning_model or not planning_model.is_trained:
+            logger.info("Planning model not available, using fallback")
             
-            base_demand = 2.5
-            if start_dt.month in [5, 6, 7, 8, 9]:
-                base_demand = 3.2
+            template = fallback_prediction_template(days, start_dt.month in (5, 6, 7, 8, 9))
             
             prediction = {
                 'material_id': material_id,
@@ -292,34 +514,39 @@ def predict_demand():
                     'end_date': end_date,
                     'days': days
                 },
-                'summary': {
-                    'average_demand': round(base_demand, 2),
-                    'maximum_demand': int(base_demand * 1.5),
-                    'minimum_demand': int(base_demand * 0.5),
-                    'total_predicted_demand': int(base_demand * days),
-                    'overall_confidence': 0.75
-                },
-                'daily_predictions': [],
-                'recommendations': [
-                    {
-                        'type': 'fallback',
-                        'message': 'Using simplified prediction model',
-                        'priority': 'medium'
-                    }
-                ]
+                'summary': template['summary'],
+                'recommendations': template['recommendations']
             }
             
-            # Generate daily predictions
-            current_date = start_dt
-            while current_date <= end_dt:
-                prediction['daily_predictions'].append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'predicted_demand': int(base_demand),
-                    'confidence': 0.75
+            # Generate daily predictions (whole date range in one numpy pass)
+            dates = np.arange(np.datetime64(start_dt.date()), np.datetime64(end_dt.date()) + 1, dtype='datetime64[D]')
+            daily_demand = template['daily_demand']
+            
+            def daily_page(page_dates):
+                return [
+                    {'date': date, 'predicted_demand': daily_demand, 'confidence': 0.75}
+                    for date in page_dates.astype(str).tolist()
+                ]
+            
+            if columnar:
+                prediction['daily_predictions_format'] = 'columnar'
+                prediction['daily_predictions'] = {
+                    'date': dates.astype(str).tolist(),
+                    'predicted_demand': np.full(len(dates), daily_demand, dtype=np.int32),
+                    'confidence': np.full(len(dates), 0.75)
+                }
+                return orjson_response({
+                    'success': True,
+                    'data': prediction
                 })
-                current_date += timedelta(days=1)
             
-            return jsonify({
+            if days > Config.STREAM_THRESHOLD_DAYS:
+                pages = (daily_page(dates[i:i + STREAM_PAGE_SIZE]) for i in range(0, len(dates), STREAM_PAGE_SIZE))
+                return stream_prediction_response(prediction, pages)
+            
+            prediction['daily_predictions'] = daily_page(dates)
+            
+            return orjson_response({
                 'success': True,
                 'data': prediction
             })
@@ -333,58 +560,73 @@ def predict_demand():
         
         logger.info(f"Prediction completed for material {material_id}")
         
-        return jsonify({
+        if columnar:
+            result['daily_predictions_format'] = 'columnar'
+            result['daily_predictions'] = to_columnar(result['daily_predictions'])
+        elif result['period']['days'] > Config.STREAM_THRESHOLD_DAYS:
+            daily = result.pop('daily_predictions')
+            pages = (daily[i:i + STREAM_PAGE_SIZE] for i in range(0, len(daily), STREAM_PAGE_SIZE))
+            return stream_prediction_response(result, pages)
+        
+        return orjson_response({
             'success': True,
-            'data': sanitize_for_json(result)
+            'data': result
         })
         
     except Exception as e:
-        logger.error(f"Error in predict_demand: {e}")
-        logger.error(traceback.format_exc())
-        return jsonify({
+        logger.exception(f"Error in predict_demand: {e}")
+        return orjson_response({
             'success': False,
             'message': f'Prediction service error: {str(e)}'
-        }), 500
+        }, 500)
 
-@app.route('/api/ai/recommend-equipment', methods=['POST', 'OPTIONS'])
+@app.route('/api/ai/recommend-equipment', methods=['POST'])
 def recommend_equipment():
-    if request.method == 'OPTIONS':
-        return '', 200
-        
     try:
         logger.info("Enhanced equipment recommendation request received")
         
         data = request.get_json()
         if not data or not data.get('query'):
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Query is required'
-            }), 400
+            }, 400)
             
         query = data.get('query', '').strip()
         days = data.get('days', 1)
         
-        logger.info(f"Processing query: '{query}' for {days} days")
+        logger.debug(f"Processing query: '{query}' for {days} days")
         
         if len(query) < 3:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Query must be at least 3 characters long'
-            }), 400
+            }, 400)
         
+        try:
+            days = int(days)
+        except (TypeError, ValueError):
+            days = 0
+        if days < 1:
+            return orjson_response({
+                'success': False,
+                'message': 'Days must be a positive integer'
+            }, 400)
+        
+        recommendation_model = get_recommendation_model()
         if not recommendation_model:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Recommendation model not available'
-            }), 503
+            }, 503)
         
         recommendations = recommendation_model.get_recommendations(query, days)
         
         if not recommendations.get('success', False):
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': recommendations.get('message', 'No recommendations found')
-            }), 400
+            }, 400)
         
         response_data = {
             'explanation': recommendations.get('message', 'Here are my recommendations:'),
@@ -395,7 +637,7 @@ def recommend_equipment():
         
         for rec in recommendations.get('recommendations', []):
             formatted_rec = {
-                'id': f"rec_{abs(hash(rec.get('camera', '')))}",
+                'id': rec['id'],
                 'name': f"{rec.get('camera', 'Camera')} + {rec.get('objectif', 'Lens')}",
                 'category': rec.get('type', 'Equipment').title(),
                 'description': f"{rec.get('type', 'equipment')} setup",
@@ -410,92 +652,77 @@ def recommend_equipment():
         
         logger.info(f"Recommendations generated: {len(response_data['recommendations'])} items")
         
-        return jsonify({
+        return orjson_response({
             'success': True,
             'data': response_data
         })
         
     except Exception as e:
-        logger.error(f"Error in recommend_equipment: {e}")
-        logger.error(traceback.format_exc())
-        return jsonify({
+        logger.exception(f"Error in recommend_equipment: {e}")
+        return orjson_response({
             'success': False,
             'message': 'Recommendation service error',
             'error': str(e)
-        }), 500
+        }, 500)
+
+def _build_equipment_stats():
+    stats = _rec_info['get_stats']()
+    
+    # Only report a planning model that is already there: get_planning_model()
+    # would train it inline and hold this request for the whole run
+    model = planning_model
+    if model is not None and getattr(model, 'is_trained', False):
+        stats['planning_model'] = {
+            'accuracy': round(float(model.accuracy), 3),
+            'mae': round(float(model.mae), 3)
+        }
+    else:
+        stats['planning_model'] = {'loaded': False, 'trained': False}
+    
+    return {
+        'success': True,
+        'data': stats
+    }
 
 @app.route('/api/ai/equipment-stats', methods=['GET'])
 def equipment_stats():
     try:
-        if not recommendation_model:
-            return jsonify({
+        if not get_recommendation_model():
+            return orjson_response({
                 'success': False,
                 'message': 'Recommendation model not available'
-            }), 503
-            
-        stats = recommendation_model.get_equipment_stats()
-        stats = sanitize_for_json(stats)
+            }, 503)
         
-        if planning_model and planning_model.is_trained:
-            stats['planning_model'] = {
-                'accuracy': round(float(planning_model.accuracy), 3),
-                'mae': round(float(planning_model.mae), 3)
-            }
-        
-        return jsonify({
-            'success': True,
-            'data': stats
-        })
+        return cached_response('equipment_stats', _build_equipment_stats)
         
     except Exception as e:
         logger.error(f"Error in equipment_stats: {e}")
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': str(e)
-        }), 500
+        }, 500)
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
-        'success': False,
-        'message': 'Endpoint not found',
-        'available_endpoints': [
-            '/health',
-            '/api/ai/model-info',
-            '/api/ai/recommend-equipment',
-            '/api/ai/predict-demand',
-            '/api/ai/equipment-stats'
-        ]
-    }), 404
+    return app.response_class(NOT_FOUND_PAYLOAD, status=404, mimetype='application/json')
 
 @app.errorhandler(500)
 def internal_error(error):
     logger.error(f"Internal server error: {error}")
-    return jsonify({
+    return orjson_response({
         'success': False,
         'message': 'AI service internal error',
         'error': str(error)
-    }), 500
-
-def check_port(port):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(1)
-    result = sock.connect_ex(('127.0.0.1', port))
-    sock.close()
-    return result != 0
+    }, 500)
 
 if __name__ == '__main__':
+    # LOG_LEVEL only gates the file, so per-request INFO lines can be kept off disk
+    setup_logging(Config.LOG_FILE, file_level=Config.LOG_LEVEL.upper())
     logger.info("Starting Enhanced AI Service...")
     
-    if not initialize_models():
-        logger.error("Failed to initialize models properly")
-    
     port = int(os.environ.get('AI_SERVICE_PORT', 5001))
     debug = os.environ.get('FLASK_ENV') == 'development'
-    
-    if not check_port(port):
-        logger.error(f"Port {port} is already in use!")
-        exit(1)
+    workers = int(os.environ.get('AI_SERVICE_WORKERS', os.cpu_count() or 1))
     
     logger.info(f"Enhanced AI Service Configuration:")
     logger.info(f"   Port: {port}")
@@ -503,14 +730,44 @@ if __name__ == '__main__':
     logger.info(f"   Health: http://127.0.0.1:{port}/health")
     logger.info(f"   Model Info: http://127.0.0.1:{port}/api/ai/model-info")
     
+    # Every gunicorn worker imports wsgi.py and loads the models itself (no
+    # --preload, see wsgi.py); train and save them once here so they only load
+    if not debug and sys.platform != "win32" and shutil.which('gunicorn'):
+        logger.info(f"   Server: gunicorn ({workers} workers)")
+        if not prime_model_cache():
+            logger.error("Failed to initialize models properly")
+        # exec replaces the process without running atexit: write out queued records now
+        stop_logging()
+        os.execvp('gunicorn', [
+            'gunicorn',
+            '--chdir', str(Path(__file__).resolve().parent),
+            '-w', str(workers),
+            '-k', 'gthread',
+            '--threads', '4',
+            '--reuse-port',
+            '-b', f'0.0.0.0:{port}',
+            'wsgi:app'
+        ])
+    
+    if not initialize_models():
+        logger.error("Failed to initialize models properly")
+    
     try:
-        app.run(
-            host='0.0.0.0',
-            port=port,
-            debug=debug,
-            threaded=True,
-            use_reloader=False
-        )
+        if debug:
+            # Werkzeug dev server only for local debugging (no reloader: it would retrain the models)
+            app.run(host='0.0.0.0', port=port, debug=True, use_reloader=False)
+        else:
+            from waitress import serve
+            logger.info(f"   Server: waitress ({workers * 4} threads)")
+            serve(app, host='0.0.0.0', port=port, threads=workers * 4)
+    except OSError as e:
+        if e.errno == errno.EADDRINUSE:
+            logger.error(f"Port {port} is already in use!")
+        elif e.errno == errno.EACCES:
+            logger.error(f"Permission denied binding port {port}")
+        else:
+            logger.error(f"Failed to start AI service: {e}")
+        exit(1)
     except Exception as e:
         logger.error(f"Failed to start AI service: {e}")
-        exit(1)
\ No newline at end of file
+        exit(1)
@@ -15,12 +15,17 @@ class Config:
     ENABLE_CACHING = os.environ.get('ENABLE_MODEL_CACHING', 'True').lower() == 'true'
     CACHE_TTL = int(os.environ.get('MODEL_CACHE_TTL', 3600))
     
+    # Prediction windows longer than this (in days) are streamed
+    STREAM_THRESHOLD_DAYS = int(os.environ.get('PREDICTION_STREAM_THRESHOLD_DAYS', 366))
+    # Longest prediction window (in days) a request may ask for
+    MAX_PREDICTION_DAYS = int(os.environ.get('PREDICTION_MAX_DAYS', 3660))
+    
     # Logging Configuration
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FILE = os.environ.get('LOG_FILE', 'ai_service.log')
     
     # CORS Configuration
-    CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5000').split(',')
+    CORS_ORIGINS = [origin.strip() for origin in os.environ.get('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5000').split(',') if origin.strip()]
     
     @staticmethod
     def init_app(app):
@@ -0,0 +1,155 @@
+"""
+Logging setup shared by the service entrypoints (start_service.py, wsgi.py, app.py)
+
+Loggers only enqueue records; a QueueListener thread owns the file and
+stdout handlers, so request threads never block on log I/O. Nothing here
+runs at import time: the entrypoint calls setup_logging() once.
+"""
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+log_listener = None
+queue_handler = None
+
+class FastFormatter(logging.Formatter):
+    """'%(asctime)s - %(name)s - %(levelname)s - %(message)s' built with one f-string
+    
+    The date part is only formatted again when the second changes.
+    """
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        self._last_second = None
+        self._last_date = ''
+    
+    def format(self, record):
+        second = int(record.created)
+        if second != self._last_second:
+            self._last_date = time.strftime('%Y-%m-%d %H:%M:%S', self.converter(second))
+            self._last_second = second
+        line = f"{self._last_date},{int(record.msecs):03d} - {record.name} - {record.levelname} - {record.getMessage()}"
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line = f"{line}\n{record.exc_text}"
+        if record.stack_info:
+            line = f"{line}\n{self.formatStack(record.stack_info)}"
+        return line
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that writes through a 64 KB buffer instead of flushing every record
+    
+    Buffered records reach the file when the buffer fills, every
+    flush_interval seconds, on close, and right away for ERROR and above.
+    """
+    buffer_size = 65536
+    
+    def __init__(self, filename, mode='a', encoding=None, delay=False, errors=None, flush_interval=5.0):
+        super().__init__(filename, mode, encoding, delay, errors)
+        self._closing = threading.Event()
+        self._flush_interval = flush_interval
+        self.start_flush_thread()
+    
+    def start_flush_thread(self):
+        threading.Thread(target=self._flush_periodically, args=(self._flush_interval,),
+                         name='log-flush', daemon=True).start()
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def _flush_periodically(self, interval):
+        while not self._closing.wait(interval):
+            self.flush()
+    
+    def close(self):
+        self._closing.set()
+        super().close()
+
+def setup_logging(log_file, level=logging.INFO, file_level=None, console=True):
+    """Route the root logger through a queue to log_file (and stdout if console)
+    
+    file_level, if given, additionally gates what reaches the file. Calling
+    it again once logging is set up does nothing.
+    """
+    global log_listener, queue_handler
+    if log_listener is not None:
+        return
+    
+    # The format never shows them, so skip the per-record thread/process lookups
+    # and the stack walk that finds each caller's file, line and function
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging._srcfile = None
+    
+    # Fix Windows Unicode logging issues (before the stdout handler grabs the stream)
+    if sys.platform == "win32":
+        import codecs
+        sys.stdout = codecs.getwriter("utf-8")(sys.stdout.detach())
+        sys.stderr = codecs.getwriter("utf-8")(sys.stderr.detach())
+    
+    log_formatter = FastFormatter()
+    file_handler = BufferedFileHandler(log_file, encoding='utf-8', delay=True)
+    if file_level is not None:
+        file_handler.setLevel(file_level)
+    handlers = [file_handler]
+    if console:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(log_formatter)
+    
+    queue_handler = QueueHandler(queue.Queue(-1))
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+    
+    log_listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(stop_logging)
+    # The listener and flush threads do not survive fork (--zygote workers, prime_model_cache)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(before=_flush_log_handlers, after_in_child=_restart_logging)
+
+def _flush_log_handlers():
+    """Write out buffered records so a forked child does not inherit and repeat them"""
+    if log_listener is not None:
+        for handler in log_listener.handlers:
+            handler.flush()
+
+def _restart_logging():
+    """Threads do not survive fork: give the child its own listener and flush thread"""
+    global log_listener
+    if log_listener is None:
+        return
+    handlers = log_listener.handlers
+    for handler in handlers:
+        if isinstance(handler, BufferedFileHandler):
+            handler.start_flush_thread()
+    queue_handler.queue = queue.Queue(-1)
+    log_listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    log_listener.start()
+
+def stop_logging():
+    """Flush queued records and stop the background log writer"""
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        _flush_log_handlers()
+        log_listener = None
@@ -1,23 +1,113 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+import functools
+import hashlib
+from collections import namedtuple
+from dataclasses import dataclass
+from pandas.api.extensions import take
+import sklearn
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report, mean_absolute_error
-from sklearn.preprocessing import StandardScaler, LabelEncoder
 from datetime import datetime, timedelta
+import importlib.util
 import logging
 import os
-import joblib
 import re
+import joblib
 
 logger = logging.getLogger(__name__)
 
+# pyarrow's multithreaded CSV reader when installed, pandas' C parser otherwise
+_CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') else 'c'
+
+# Narrow dtypes for the engineered feature columns
+_FEATURE_DTYPES = {
+    **dict.fromkeys(['mois', 'jour_semaine', 'trimestre', 'saison', 'est_weekend', 'est_vacances',
+                     'saison_mariage', 'saison_affaires', 'periode_fetes', 'categorie_encoded'], np.int8),
+    **dict.fromkeys(['semaine', 'materiel_encoded'], np.int16),
+    **dict.fromkeys(['mois_sin', 'mois_cos', 'semaine_sin', 'semaine_cos',
+                     'stock_log', 'taux_utilisation', 'pression_stock'], np.float32),
+}
+
+# Candidate model features, in training column order; the ones missing
+# from the loaded data are left out
+_BASE_FEATURES = (
+    'materiel_encoded', 'stock', 'mois', 'semaine', 'jour_semaine',
+    'est_weekend', 'est_vacances', 'trimestre', 'saison'
+)
+_ADVANCED_FEATURES = (
+    'saison_mariage', 'saison_affaires', 'periode_fetes',
+    'mois_sin', 'mois_cos', 'semaine_sin', 'semaine_cos',
+    'stock_log', 'taux_utilisation', 'pression_stock'
+)
+
+# Bump when the saved model's contents or their meaning change
+# (features, encodings, lookups) so older planning_model.joblib files retrain
+_MODEL_FORMAT_VERSION = 1
+
+# Month (1-12) -> season code, indexed directly by month; index 0 stands
+# for an unknown month and falls through to autumn like the old else branch
+_SEASON_LUT = np.array([4, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4, 1], dtype=np.int8)
+_SEASON_NAMES = ('Autumn', 'Winter', 'Winter', 'Spring', 'Spring', 'Spring',
+                 'Summer', 'Summer', 'Summer', 'Autumn', 'Autumn', 'Autumn', 'Winter')
+
+def _flag_lut(months):
+    """Month-indexed int8 table that is 1 for the given months"""
+    lut = np.zeros(13, dtype=np.int8)
+    lut[months] = 1
+    return lut
+
+_VACATION_LUT = _flag_lut([7, 8, 12, 1])
+_WEDDING_LUT = _flag_lut([5, 6, 7, 8, 9])
+_BUSINESS_LUT = _flag_lut([3, 4, 5, 9, 10, 11])
+_HOLIDAY_LUT = _flag_lut([12, 1])
+
+_RISK_DESCRIPTIONS = {
+    'low': 'Demand is well within capacity. Low risk of stockouts.',
+    'medium': 'Demand approaches capacity limits. Monitor closely.',
+    'high': 'High risk of stockouts. Immediate action required.'
+}
+
+_ENHANCEMENTS = (
+    'temporal_feature_engineering',
+    'cyclical_encoding',
+    'material_categorization',
+    'stock_pressure_analysis',
+    'seasonal_pattern_detection',
+    'risk_assessment',
+    'enhanced_recommendations',
+    'mongodb_objectid_support'
+)
+
+# Per-day aggregates shared by the recommendation and insight reports
+ForecastScan = namedtuple('ForecastScan', [
+    'days', 'low_count', 'peak_idx', 'month_first_idx', 'month_means', 'weekend_avg', 'weekday_avg'
+])
+
+@dataclass(frozen=True)
+class Recommendation:
+    """One stock recommendation; orjson serializes it like the dict it replaces"""
+    __slots__ = ('type', 'priority', 'message', 'action', 'impact')
+    type: str
+    priority: str
+    message: str
+    action: str
+    impact: str
+
+@functools.lru_cache(maxsize=4096)
+def _id_hash(material_id):
+    """First 32 bits of the MD5 of a string material ID, shared by encoding and stock lookups"""
+    return int(hashlib.md5(material_id.encode()).hexdigest()[:8], 16)
+
 def convert_to_json_serializable(obj):
     """Convert numpy types to native Python types for JSON serialization"""
-    if isinstance(obj, (np.integer, np.int64, np.int32)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, np.float64, np.float32)):
-        return float(obj)
+    # Most nodes are already native, so check those first. Exact types, since
+    # np.float64 subclasses float and must still be converted below
+    if obj is None or type(obj) in (str, int, float, bool):
+        return obj
+    elif isinstance(obj, np.generic):
+        return obj.item()
     elif isinstance(obj, np.ndarray):
         return obj.tolist()
     elif isinstance(obj, dict):
@@ -27,17 +117,117 @@ def convert_to_json_serializable(obj):
     return obj
 
 class PlanningModel:
+    # Checked in order; the first matching category wins
+    CATEGORY_PATTERNS = [
+        ('camera', re.compile(r'camera|caméra|appareil|boitier', re.IGNORECASE)),
+        ('objectif', re.compile(r'objectif|lens|optique', re.IGNORECASE)),
+        ('lumiere', re.compile(r'lumière|light|éclairage|led|flash', re.IGNORECASE)),
+        ('audio', re.compile(r'micro|audio|son|microphone', re.IGNORECASE)),
+        ('stabilisation', re.compile(r'stabilisateur|gimbal|steadicam', re.IGNORECASE)),
+        ('support', re.compile(r'trépied|tripod|support', re.IGNORECASE)),
+    ]
+
+    # Histogram-based boosting bins features once, so splits are linear
+    # scans instead of the per-tree sorts a random forest does
+    HYPERPARAMETERS = {
+        'max_iter': 300,
+        'max_depth': 8,
+        'learning_rate': 0.05,
+        'max_bins': 255,
+        'min_samples_leaf': 3,
+        'class_weight': 'balanced',
+        'early_stopping': True,
+        'validation_fraction': 0.1,
+        'random_state': 42
+    }
+    
+    # The parts of get_model_info that never change, shared by every instance
+    _STATIC_INFO = {
+        'model_type': 'Enhanced HistGradientBoostingClassifier',
+        'hyperparameters': HYPERPARAMETERS,
+        'enhancements': _ENHANCEMENTS,
+        'version': '2.0_enhanced'
+    }
+
     def __init__(self, data_path='models/data/'):
         self.data_path = data_path
         self.model = None
-        self.scaler = StandardScaler()
         self.label_encoders = {}
         self.data = None
         self.accuracy = 0
         self.mae = 0
         self.is_trained = False
         self.feature_names = []
-        
+        self._stock_by_id = {}
+        self._stock_cache = {}
+        self._encoded_by_id = {}
+        self.data_records = 0
+        self._model_path = os.path.join(self.data_path, 'planning_model.joblib')
+    
+    def _source_mtimes(self):
+        """Modification times of the training CSVs (None for missing files)"""
+        mtimes = []
+        for name in ('reservations_3000.csv', 'materiel_corrige_final.csv'):
+            path = os.path.join(self.data_path, name)
+            mtimes.append(os.path.getmtime(path) if os.path.exists(path) else None)
+        return mtimes
+    
+    def _training_signature(self):
+        """Hash of the hyperparameters and candidate features a saved model was trained with"""
+        spec = repr((sorted(self.HYPERPARAMETERS.items()), _BASE_FEATURES, _ADVANCED_FEATURES))
+        return hashlib.blake2b(spec.encode(), digest_size=16).hexdigest()
+    
+    def save(self):
+        """Persist the trained model and its lookups next to the training data"""
+        try:
+            joblib.dump({
+                'model': self.model,
+                'features': self.feature_names,
+                'label_encoders': self.label_encoders,
+                'stock_by_id': self._stock_by_id,
+                'encoded_by_id': self._encoded_by_id,
+                'accuracy': self.accuracy,
+                'mae': self.mae,
+                'data_records': self.data_records,
+                'csv_mtimes': self._source_mtimes(),
+                'sklearn_version': sklearn.__version__,
+                'format_version': _MODEL_FORMAT_VERSION,
+                'training_signature': self._training_signature()
+            }, self._model_path, compress=3)
+            logger.info(f"Planning model saved to {self._model_path}")
+        except Exception as e:
+            logger.warning(f"Could not save planning model: {e}")
+    
+    def _load_saved_model(self):
+        """Restore a saved model if it was trained on the current CSVs"""
+        if not os.path.exists(self._model_path):
+            return False
+        try:
+            saved = joblib.load(self._model_path)
+            if (saved.get('format_version') != _MODEL_FORMAT_VERSION
+                    or saved.get('training_signature') != self._training_signature()
+                    or saved.get('csv_mtimes') != self._source_mtimes()
+                    or saved.get('sklearn_version') != sklearn.__version__):
+                logger.info("Saved planning model is stale, retraining")
+                return False
+            
+            self.model = saved['model']
+            self.feature_names = saved['features']
+            self.label_encoders = saved['label_encoders']
+            self._stock_by_id = saved['stock_by_id']
+            self._stock_cache.clear()
+            self._encoded_by_id = saved['encoded_by_id']
+            self.accuracy = saved['accuracy']
+            self.mae = saved['mae']
+            self.data_records = saved['data_records']
+            self.is_trained = True
+            
+            logger.info(f"Planning model loaded from {self._model_path}")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not load saved planning model: {e}")
+            return False
+    
     def load_data(self):
         """Load and prepare the training data with enhanced processing"""
         try:
@@ -52,17 +242,13 @@ class PlanningModel:
                 
             logger.info(f"Loading data from {reservations_path} and {materiel_path}")
             
-            reservations = pd.read_csv(reservations_path)
-            materiel = pd.read_csv(materiel_path)
+            reservations = pd.read_csv(reservations_path, engine=_CSV_ENGINE, parse_dates=['date_debut', 'date_fin'])
+            materiel = pd.read_csv(materiel_path, engine=_CSV_ENGINE)
             
             logger.info(f"Loaded {len(reservations)} reservations and {len(materiel)} materials")
             
-            # Enhanced data cleaning
-            reservations = self._enhanced_clean_reservations(reservations)
-            materiel = self._enhanced_clean_materiel(materiel)
-            
-            # Merge datasets with enhanced logic
-            self.data = self._enhanced_merge_data(reservations, materiel)
+            # Clean and merge datasets
+            self.data = self._build_data(reservations, materiel)
             
             # Enhanced data preprocessing
             self.data = self._enhanced_preprocessing(self.data)
@@ -79,51 +265,49 @@ class PlanningModel:
         logger.info("Creating enhanced sample data...")
         
         # Create more realistic reservations data
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         n_reservations = 3000
         
         # Generate dates over 2 years for better temporal patterns
-        start_date = datetime(2023, 1, 1)
-        end_date = datetime(2024, 12, 31)
-        
+        start_date = pd.Timestamp(2023, 1, 1)
+        end_date = pd.Timestamp(2024, 12, 31)
+        
+        # Random start dates and durations based on realistic patterns
+        random_days = rng.integers(0, (end_date - start_date).days, n_reservations)
+        date_debut = start_date + pd.to_timedelta(random_days, unit='D')
+        durations = rng.choice([1, 2, 3, 4, 5, 7, 14], size=n_reservations, p=[0.4, 0.25, 0.15, 0.1, 0.05, 0.03, 0.02])
+        date_fin = date_debut + pd.to_timedelta(durations, unit='D')
+        
+        # Demand based on seasonal and equipment patterns:
+        # higher demand in wedding season (May-Sept) and holidays
+        month = date_debut.month.to_numpy()
+        wedding_season = _WEDDING_LUT[month].astype(bool)
+        holidays = _HOLIDAY_LUT[month].astype(bool)
+        other = ~(wedding_season | holidays)
+        
+        demande = np.empty(n_reservations, dtype=np.int8)
+        demande[wedding_season] = rng.choice([2, 3, 4, 5], size=wedding_season.sum(), p=[0.2, 0.3, 0.3, 0.2])
+        demande[holidays] = rng.choice([1, 2, 3, 4], size=holidays.sum(), p=[0.3, 0.3, 0.3, 0.1])
+        demande[other] = rng.choice([1, 2, 3, 4, 5], size=other.sum(), p=[0.25, 0.35, 0.25, 0.1, 0.05])
+        
+        reservation_ids = np.arange(1, n_reservations + 1, dtype=np.int32)
+        materiel_ids = rng.integers(1, 56, n_reservations).astype(np.int32)
+        client_ids = rng.integers(1, 501, n_reservations).astype(np.int32)
+        statut_codes = rng.choice(3, n_reservations, p=[0.7, 0.2, 0.1])
+        
+        # Every column is already an array, so the frame wraps them without copying
         reservations_data = {
-            'reservation_id': range(1, n_reservations + 1),
-            'materiel_id': np.random.randint(1, 56, n_reservations),
-            'client_id': np.random.randint(1, 501, n_reservations),
-            'date_debut': [],
-            'date_fin': [],
-            'demande': [],
-            'statut': np.random.choice(['confirme', 'en_attente', 'annule'], n_reservations, p=[0.7, 0.2, 0.1]),
-            'id': range(1, n_reservations + 1)
+            'reservation_id': reservation_ids,
+            'materiel_id': materiel_ids,
+            'client_id': client_ids,
+            'date_debut': date_debut,
+            'date_fin': date_fin,
+            'demande': demande,
+            'statut': pd.Categorical.from_codes(statut_codes, categories=['confirme', 'en_attente', 'annule']),
+            'id': reservation_ids
         }
         
-        # Generate realistic dates and demands
-        for i in range(n_reservations):
-            # Random start date
-            random_days = np.random.randint(0, (end_date - start_date).days)
-            date_debut = start_date + timedelta(days=random_days)
-            
-            # Duration based on realistic patterns
-            duration = np.random.choice([1, 2, 3, 4, 5, 7, 14], p=[0.4, 0.25, 0.15, 0.1, 0.05, 0.03, 0.02])
-            date_fin = date_debut + timedelta(days=duration)
-            
-            reservations_data['date_debut'].append(date_debut.strftime('%Y-%m-%d'))
-            reservations_data['date_fin'].append(date_fin.strftime('%Y-%m-%d'))
-            
-            # Demand based on seasonal and equipment patterns
-            month = date_debut.month
-            
-            # Higher demand in wedding season (May-Sept) and holidays
-            if month in [5, 6, 7, 8, 9]:
-                base_demand = np.random.choice([2, 3, 4, 5], p=[0.2, 0.3, 0.3, 0.2])
-            elif month in [12, 1]:
-                base_demand = np.random.choice([1, 2, 3, 4], p=[0.3, 0.3, 0.3, 0.1])
-            else:
-                base_demand = np.random.choice([1, 2, 3, 4, 5], p=[0.25, 0.35, 0.25, 0.1, 0.05])
-            
-            reservations_data['demande'].append(base_demand)
-        
-        reservations = pd.DataFrame(reservations_data)
+        reservations = pd.DataFrame(reservations_data, copy=False)
         
         # Create realistic material data
         equipment_types = [
@@ -134,98 +318,78 @@ class PlanningModel:
             'Trépied Manfrotto', 'Moniteur Atomos Ninja'
         ] * 4
         
+        quantite = rng.integers(2, 15, 55)
+        quantite_reservee = rng.integers(0, 5, 55)
+        quantite_en_attente = rng.integers(0, 3, 55)
+        
         materiel_data = {
             'materiel_id': range(1, 56),
             'materiel': equipment_types[:55],
-            'quantite': np.random.randint(2, 15, 55),
+            'quantite': quantite,
             'disponible': [True] * 55,
-            'quantite_reservee': np.random.randint(0, 5, 55),
-            'quantite_en_attente': np.random.randint(0, 3, 55),
-            'quantite_disponible': []
+            'quantite_reservee': quantite_reservee,
+            'quantite_en_attente': quantite_en_attente,
+            # Available quantity, never negative
+            'quantite_disponible': np.maximum(0, quantite - quantite_reservee - quantite_en_attente)
         }
         
-        # Calculate available quantity
-        for i in range(55):
-            total = materiel_data['quantite'][i]
-            reserved = materiel_data['quantite_reservee'][i]
-            pending = materiel_data['quantite_en_attente'][i]
-            available = max(0, total - reserved - pending)
-            materiel_data['quantite_disponible'].append(available)
-        
         materiel = pd.DataFrame(materiel_data)
         
         # Process and merge
-        reservations = self._enhanced_clean_reservations(reservations)
-        materiel = self._enhanced_clean_materiel(materiel)
-        self.data = self._enhanced_merge_data(reservations, materiel)
+        self.data = self._build_data(reservations, materiel)
         self.data = self._enhanced_preprocessing(self.data)
         
         logger.info(f"Enhanced sample data created: {len(self.data)} records")
     
-    def _enhanced_clean_reservations(self, df):
-        """Enhanced cleaning for reservations data"""
-        logger.info("Enhanced cleaning of reservations data...")
+    def _build_data(self, reservations, materiel):
+        """Clean reservations and materials and left-join them in a single pass"""
+        logger.info("Cleaning and merging reservations and material data...")
         
-        # Clean material IDs
-        def clean_material_id(value):
-            if isinstance(value, str):
-                numbers = re.findall(r'\d+', value)
-                return int(numbers[0]) if numbers else 1
-            return int(value) if pd.notna(value) else 1
-        
-        df['materiel_id'] = df['materiel_id'].apply(clean_material_id)
-        
-        # Clean demand values
-        if 'quantite' in df.columns:
-            df = df.rename(columns={'quantite': 'demande'})
-        
-        # Ensure demand is in valid range
-        df['demande'] = df['demande'].clip(1, 5)
-        
-        # Remove invalid records
-        df = df.dropna(subset=['materiel_id', 'demande'])
-        
-        return df
-    
-    def _enhanced_clean_materiel(self, df):
-        """Enhanced cleaning for material data"""
-        logger.info("Enhanced cleaning of material data...")
+        # Rename columns for clarity
+        reservations = reservations.rename(columns={'quantite': 'demande'})
+        materiel = materiel.rename(columns={'quantite': 'stock'})
         
-        def clean_material_id(value):
-            if isinstance(value, str):
-                numbers = re.findall(r'\d+', value)
-                return int(numbers[0]) if numbers else 1
-            return int(value) if pd.notna(value) else 1
+        # Ensure demand is in valid range and drop records without one
+        demande = reservations['demande'].clip(1, 5)
+        valid = demande.notna().to_numpy()
         
-        df['materiel_id'] = df['materiel_id'].apply(clean_material_id)
+        columns = {col: reservations[col].array[valid] for col in reservations.columns}
+        columns['materiel_id'] = self._clean_material_ids(reservations['materiel_id']).to_numpy()[valid]
+        columns['demande'] = demande.array[valid]
         
-        # Clean quantity fields
-        quantity_fields = ['quantite', 'quantite_reservee', 'quantite_en_attente', 'quantite_disponible']
-        for field in quantity_fields:
-            if field in df.columns:
-                df[field] = pd.to_numeric(df[field], errors='coerce').fillna(0).astype(int)
+        # Left join on materiel_id: position of each reservation's material, -1 if unknown
+        material_ids = pd.Index(self._clean_material_ids(materiel['materiel_id']))
+        first = ~material_ids.duplicated()
+        positions = material_ids[first].get_indexer(columns['materiel_id'])
         
-        return df
-    
-    def _enhanced_merge_data(self, reservations, materiel):
-        """Enhanced data merging with better handling"""
-        logger.info("Enhanced merging of datasets...")
+        quantity_fields = ['stock', 'quantite_reservee', 'quantite_en_attente', 'quantite_disponible']
+        for col in materiel.columns.drop('materiel_id'):
+            values = materiel[col]
+            if col in quantity_fields:
+                values = pd.to_numeric(values, errors='coerce').fillna(0).astype(int)
+            target = col if col not in columns else f'{col}_material'
+            columns[target] = take(values.array[first], positions, allow_fill=True)
         
-        # Rename columns for clarity
-        if 'quantite' in reservations.columns:
-            reservations = reservations.rename(columns={'quantite': 'demande'})
-        if 'quantite' in materiel.columns:
-            materiel = materiel.rename(columns={'quantite': 'stock'})
+        data = pd.DataFrame(columns, copy=False)
         
-        # Merge with enhanced logic
-        data = pd.merge(reservations, materiel, on='materiel_id', how='left', suffixes=('', '_material'))
-        
-        # Fill missing values intelligently
-        data['stock'] = data['stock'].fillna(data['stock'].median())
-        data['quantite_disponible'] = data['quantite_disponible'].fillna(data['stock'])
+        # Fill missing material values intelligently
+        if (positions < 0).any():
+            data['stock'] = data['stock'].fillna(data['stock'].median())
+            data['quantite_disponible'] = data['quantite_disponible'].fillna(data['stock'])
         
         return data
     
+    def _clean_material_ids(self, ids):
+        """Vectorized material ID cleaning: first number found in strings, int() of numbers, 1 if missing"""
+        if pd.api.types.is_numeric_dtype(ids):
+            return ids.fillna(1).astype(np.int64)
+        
+        # .str accessors yield NaN for non-string cells
+        is_str = ids.str.len().notna()
+        from_str = pd.to_numeric(ids.str.extract(r'(\d+)', expand=False), errors='coerce')
+        from_num = pd.to_numeric(ids.where(~is_str), errors='coerce')
+        return from_str.where(is_str, from_num).fillna(1).astype(np.int64)
+    
     def _enhanced_preprocessing(self, data):
         """Enhanced preprocessing with better feature engineering"""
         logger.info("Enhanced preprocessing and feature engineering...")
@@ -246,8 +410,16 @@ class PlanningModel:
         # Handle missing values more intelligently
         data = self._enhanced_handle_missing_values(data)
         
+        # Shrink feature columns to cut memory traffic during training
+        data = self._downcast_features(data)
+        
         return data
     
+    def _downcast_features(self, data):
+        """Downcast engineered feature columns to compact dtypes"""
+        dtypes = {col: dtype for col, dtype in _FEATURE_DTYPES.items() if col in data.columns}
+        return data.astype(dtypes, copy=False)
+    
     def _enhanced_convert_dates(self, data):
         """Enhanced date conversion with better error handling"""
         date_columns = ['date_debut', 'date_fin', 'date_reservation']
@@ -277,18 +449,20 @@ class PlanningModel:
         data['trimestre'] = data['date_debut'].dt.quarter
         
         # Enhanced features
+        # Unparseable dates leave NaN months; index those as month 0
+        months = data['mois'].fillna(0).to_numpy(dtype=np.int64)
         data['est_weekend'] = (data['jour_semaine'] >= 5).astype(int)
-        data['est_vacances'] = data['mois'].isin([7, 8, 12, 1]).astype(int)
-        data['saison'] = data['mois'].apply(self._get_season)
+        data['est_vacances'] = _VACATION_LUT[months]
+        data['saison'] = _SEASON_LUT[months]
         
         # Wedding season (high demand period)
-        data['saison_mariage'] = data['mois'].isin([5, 6, 7, 8, 9]).astype(int)
+        data['saison_mariage'] = _WEDDING_LUT[months]
         
         # Business season
-        data['saison_affaires'] = data['mois'].isin([3, 4, 5, 9, 10, 11]).astype(int)
+        data['saison_affaires'] = _BUSINESS_LUT[months]
         
         # Holiday periods
-        data['periode_fetes'] = data['mois'].isin([12, 1]).astype(int)
+        data['periode_fetes'] = _HOLIDAY_LUT[months]
         
         # Cyclical encoding for better ML performance
         data['mois_sin'] = np.sin(2 * np.pi * data['mois'] / 12)
@@ -299,15 +473,8 @@ class PlanningModel:
         return data
     
     def _get_season(self, month):
-        """Get season from month"""
-        if month in [12, 1, 2]:
-            return 1  # Winter
-        elif month in [3, 4, 5]:
-            return 2  # Spring
-        elif month in [6, 7, 8]:
-            return 3  # Summer
-        else:
-            return 4  # Autumn
+        """Get season from month (1=Winter, 2=Spring, 3=Summer, 4=Autumn)"""
+        return int(_SEASON_LUT[month])
     
     def _create_material_features(self, data):
         """Create enhanced material-based features"""
@@ -329,52 +496,45 @@ class PlanningModel:
         
         # Material category inference from name
         if 'materiel' in data.columns:
-            data['categorie_materiel'] = data['materiel'].apply(self._infer_category)
+            data['categorie_materiel'] = self._infer_categories(data['materiel'])
             
-            # Encode categories
-            le_cat = LabelEncoder()
-            data['categorie_encoded'] = le_cat.fit_transform(data['categorie_materiel'])
-            self.label_encoders['categorie_materiel'] = le_cat
+            # Encode categories (sorted, so codes match LabelEncoder's)
+            categories = data['categorie_materiel'].astype('category')
+            data['categorie_encoded'] = categories.cat.codes.astype(np.int16)
+            self.label_encoders['categorie_materiel'] = dict(enumerate(categories.cat.categories))
         
         return data
     
-    def _infer_category(self, materiel_name):
-        """Infer material category from name"""
-        if pd.isna(materiel_name):
-            return 'autre'
-        
-        name_lower = str(materiel_name).lower()
-        
-        if any(word in name_lower for word in ['camera', 'caméra', 'appareil', 'boitier']):
-            return 'camera'
-        elif any(word in name_lower for word in ['objectif', 'lens', 'optique']):
-            return 'objectif'
-        elif any(word in name_lower for word in ['lumière', 'light', 'éclairage', 'led', 'flash']):
-            return 'lumiere'
-        elif any(word in name_lower for word in ['micro', 'audio', 'son', 'microphone']):
-            return 'audio'
-        elif any(word in name_lower for word in ['stabilisateur', 'gimbal', 'steadicam']):
-            return 'stabilisation'
-        elif any(word in name_lower for word in ['trépied', 'tripod', 'support']):
-            return 'support'
-        else:
-            return 'autre'
+    def _infer_categories(self, names):
+        """Infer material categories from a Series of names"""
+        names = names.fillna('').astype(str)
+        conditions = [names.str.contains(pattern, na=False) for _, pattern in self.CATEGORY_PATTERNS]
+        choices = [category for category, _ in self.CATEGORY_PATTERNS]
+        return np.select(conditions, choices, default='autre')
     
     def _enhanced_handle_missing_values(self, data):
         """Enhanced missing value handling"""
-        for col in data.columns:
-            if data[col].isnull().sum() > 0:
-                if data[col].dtype == 'object':
-                    data[col] = data[col].fillna('inconnu')
-                elif col in ['stock', 'quantite_disponible']:
-                    data[col] = data[col].fillna(data[col].median())
-                else:
-                    data[col] = data[col].fillna(0)
+        # One null scan for the whole frame, then a single fillna
+        missing = data.columns[data.isna().any()]
+        if missing.empty:
+            return data
         
-        return data
+        fill_values = {}
+        for col in missing:
+            if data[col].dtype == 'object':
+                fill_values[col] = 'inconnu'
+            elif col in ['stock', 'quantite_disponible']:
+                fill_values[col] = data[col].median()
+            else:
+                fill_values[col] = 0
+        
+        return data.fillna(value=fill_values)
     
-    def load_and_train(self):
-        """Load data and train the enhanced model"""
+    def load_and_train(self, force=False):
+        """Load data and train the enhanced model, reusing a saved model unless forced"""
+        if not force and self._load_saved_model():
+            return True
+        
         try:
             logger.info("Starting enhanced model training...")
             
@@ -382,21 +542,8 @@ class PlanningModel:
             if not self.load_data():
                 raise Exception("Failed to load data")
             
-            # Define enhanced feature set
-            base_features = [
-                'materiel_encoded', 'stock', 'mois', 'semaine', 'jour_semaine',
-                'est_weekend', 'est_vacances', 'trimestre', 'saison'
-            ]
-            
-            # Add advanced features if available
-            advanced_features = [
-                'saison_mariage', 'saison_affaires', 'periode_fetes',
-                'mois_sin', 'mois_cos', 'semaine_sin', 'semaine_cos',
-                'stock_log', 'taux_utilisation', 'pression_stock'
-            ]
-            
-            # Select available features
-            self.feature_names = [f for f in base_features + advanced_features if f in self.data.columns]
+            # Select the available features, base then advanced
+            self.feature_names = [f for f in _BASE_FEATURES + _ADVANCED_FEATURES if f in self.data.columns]
             
             logger.info(f"Using {len(self.feature_names)} features: {self.feature_names}")
             
@@ -419,43 +566,45 @@ class PlanningModel:
                     X, y, test_size=0.2, random_state=42, stratify=y
                 )
             
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
-            
-            # Enhanced model with optimized hyperparameters
-            self.model = RandomForestClassifier(
-                n_estimators=300,
-                max_depth=8,
-                min_samples_split=8,
-                min_samples_leaf=3,
-                max_features='sqrt',
-                class_weight='balanced',
-                random_state=42,
-                n_jobs=-1
-            )
+            # Enhanced model with optimized hyperparameters. Tree splits are
+            # scale-invariant, so features go in unscaled; a scale-sensitive
+            # model (SVM, KNN, ...) would need a scaler again.
+            self.model = HistGradientBoostingClassifier(**self.HYPERPARAMETERS)
             
             # Train the model
-            self.model.fit(X_train_scaled, y_train)
+            self.model.fit(X_train, y_train)
             
             # Enhanced evaluation
-            y_pred = self.model.predict(X_test_scaled)
+            y_pred = self.model.predict(X_test)
             self.accuracy = float(accuracy_score(y_test, y_pred))
             self.mae = float(mean_absolute_error(y_test, y_pred))
             
-            # Calculate feature importance
-            feature_importance = dict(zip(self.feature_names, self.model.feature_importances_))
-            sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)
+            # Feature importance, when the estimator exposes it
+            importances = getattr(self.model, 'feature_importances_', None)
+            if importances is not None:
+                sorted_features = sorted(zip(self.feature_names, importances), key=lambda x: x[1], reverse=True)
+                sorted_features_clean = [(name, float(importance)) for name, importance in sorted_features]
+            else:
+                sorted_features_clean = []
             
-            # Convert to JSON-serializable format
-            sorted_features_clean = [(name, float(importance)) for name, importance in sorted_features]
+            # Per-material lookups so predictions don't rescan the training data
+            by_material = self.data.groupby('materiel_id')
+            if 'stock' in self.data.columns:
+                self._stock_by_id = by_material['stock'].first().astype(int).to_dict()
+            self._stock_cache.clear()
+            if 'materiel_encoded' in self.data.columns:
+                self._encoded_by_id = by_material['materiel_encoded'].first().astype(int).to_dict()
             
+            self.data_records = len(self.data)
             self.is_trained = True
+            self.save()
             
             logger.info(f"Enhanced model trained successfully")
             logger.info(f"Accuracy: {self.accuracy:.3f} ({self.accuracy*100:.1f}%)")
             logger.info(f"MAE: {self.mae:.3f}")
-            logger.info(f"Top 5 features: {sorted_features_clean[:5]}")
+            if sorted_features_clean:
+                logger.info(f"Top 5 features: {sorted_features_clean[:5]}")
+            logger.info(f"Boosting iterations: {self.model.n_iter_}")
             
             # Detailed classification report
             logger.info("\nClassification Report:")
@@ -479,64 +628,89 @@ class PlanningModel:
             start_dt = pd.to_datetime(start_date)
             end_dt = pd.to_datetime(end_date)
             
-            # Generate prediction features for each day
-            prediction_data = []
-            current_date = start_dt
-            
-            while current_date <= end_dt:
-                features = self._create_prediction_features(material_id, current_date)
-                prediction_data.append(features)
-                current_date += timedelta(days=1)
-            
-            # Convert to DataFrame and ensure all features are present
-            pred_df = pd.DataFrame(prediction_data)
-            
-            # Add missing features with default values
-            for feature in self.feature_names:
-                if feature not in pred_df.columns:
-                    pred_df[feature] = 0
-            
-            # Reorder columns to match training
-            pred_df = pred_df[self.feature_names]
-            
-            # Scale features
-            pred_scaled = self.scaler.transform(pred_df)
+            # Build prediction features for the whole window at once
+            dates = pd.date_range(start_dt, end_dt, freq='D')
+            if dates.empty:
+                # Nothing to predict, aggregate or report on
+                raise ValueError(f"end_date {end_date} is before start_date {start_date}")
+            months = dates.month.to_numpy()
+            weeks = dates.isocalendar().week.to_numpy(dtype=np.int64)
+            weekdays = dates.dayofweek.to_numpy()
+            stock = self._get_material_stock(material_id)
+            
+            features = {
+                'materiel_encoded': self._encode_material_id(material_id),
+                'stock': stock,
+                'mois': months,
+                'semaine': weeks,
+                'jour_semaine': weekdays,
+                'est_weekend': (weekdays >= 5).astype(int),
+                'trimestre': dates.quarter.to_numpy(),
+                'est_vacances': _VACATION_LUT[months],
+                'saison': _SEASON_LUT[months],
+                'saison_mariage': _WEDDING_LUT[months],
+                'saison_affaires': _BUSINESS_LUT[months],
+                'periode_fetes': _HOLIDAY_LUT[months],
+                'mois_sin': np.sin(2 * np.pi * months / 12),
+                'mois_cos': np.cos(2 * np.pi * months / 12),
+                'semaine_sin': np.sin(2 * np.pi * weeks / 52),
+                'semaine_cos': np.cos(2 * np.pi * weeks / 52),
+                'stock_log': np.log1p(stock),
+                'taux_utilisation': 0.5,
+                'pression_stock': 0.3
+            }
             
-            # Make predictions
-            predictions = self.model.predict(pred_scaled)
-            probabilities = self.model.predict_proba(pred_scaled)
+            # Fill one preallocated matrix in training column order; features
+            # the model wasn't trained with are skipped, missing ones stay 0
+            matrix = np.zeros((len(dates), len(self.feature_names)), dtype=np.float32)
+            for j, feature in enumerate(self.feature_names):
+                if feature in features:
+                    matrix[:, j] = features[feature]
+            pred_df = pd.DataFrame(matrix, columns=self.feature_names, copy=False)
+            
+            # Make predictions; predict() is argmax of predict_proba, so one pass gives both
+            probabilities = self.model.predict_proba(pred_df)
+            best = probabilities.argmax(axis=1)
+            predictions = self.model.classes_[best]
+            confidences = probabilities[np.arange(len(best)), best]
+            
+            # Column-wise view of the forecast, reduced once for every report below
+            forecast = {
+                'date': dates,
+                'predicted_demand': predictions,
+                'is_weekend': weekdays >= 5,
+                'month': months
+            }
+            scan = self._scan_forecast(forecast)
             
-            # Enhanced statistics
-            avg_demand = float(np.mean(predictions))
-            max_demand = int(np.max(predictions))
-            min_demand = int(np.min(predictions))
-            std_demand = float(np.std(predictions))
-            total_demand = int(np.sum(predictions))
+            # Enhanced statistics, reusing the sum and the peak already found
+            total_demand = int(predictions.sum())
+            avg_demand = total_demand / len(predictions)
+            max_demand = int(predictions[scan.peak_idx])
+            min_demand = int(predictions.min())
+            std_demand = float(predictions.std())
             
             # Enhanced confidence calculation
-            confidences = np.max(probabilities, axis=1)
             overall_confidence = float(np.mean(confidences))
             
             # Generate enhanced daily predictions
             daily_predictions = []
-            current_date = start_dt
             
-            for i, pred in enumerate(predictions):
+            for current_date, pred, confidence in zip(dates, predictions, confidences):
                 daily_pred = {
                     'date': current_date.strftime('%Y-%m-%d'),
                     'predicted_demand': int(pred),
-                    'confidence': float(confidences[i]),
+                    'confidence': float(confidence),
                     'day_of_week': current_date.strftime('%A'),
                     'is_weekend': bool(current_date.weekday() >= 5),
                     'month': current_date.strftime('%B'),
                     'season': self._get_season_name(current_date.month)
                 }
                 daily_predictions.append(daily_pred)
-                current_date += timedelta(days=1)
             
             # Enhanced recommendations
             recommendations = self._generate_enhanced_recommendations(
-                material_id, avg_demand, max_demand, min_demand, std_demand, daily_predictions
+                material_id, avg_demand, max_demand, min_demand, std_demand, scan
             )
             
             # Risk assessment
@@ -569,7 +743,7 @@ class PlanningModel:
                     'features_used': len(self.feature_names)
                 },
                 'recommendations': recommendations,
-                'insights': self._generate_insights(daily_predictions, avg_demand, max_demand)
+                'insights': self._generate_insights(forecast, scan, avg_demand)
             }
             
             return convert_to_json_serializable(result)
@@ -578,87 +752,52 @@ class PlanningModel:
             logger.error(f"Error in enhanced prediction: {e}")
             raise
     
-    def _create_prediction_features(self, material_id, date):
-        """Create enhanced features for prediction"""
-        features = {
-            'materiel_encoded': self._encode_material_id(material_id),
-            'stock': self._get_material_stock(material_id),
-            'mois': date.month,
-            'semaine': date.isocalendar().week,
-            'jour_semaine': date.weekday(),
-            'est_weekend': 1 if date.weekday() >= 5 else 0,
-            'trimestre': (date.month - 1) // 3 + 1,
-            'est_vacances': 1 if date.month in [7, 8, 12, 1] else 0,
-            'saison': self._get_season(date.month)
-        }
-        
-        # Add advanced temporal features
-        features.update({
-            'saison_mariage': 1 if date.month in [5, 6, 7, 8, 9] else 0,
-            'saison_affaires': 1 if date.month in [3, 4, 5, 9, 10, 11] else 0,
-            'periode_fetes': 1 if date.month in [12, 1] else 0,
-            'mois_sin': np.sin(2 * np.pi * date.month / 12),
-            'mois_cos': np.cos(2 * np.pi * date.month / 12),
-            'semaine_sin': np.sin(2 * np.pi * date.isocalendar().week / 52),
-            'semaine_cos': np.cos(2 * np.pi * date.isocalendar().week / 52)
-        })
-        
-        # Add stock-based features
-        stock = features['stock']
-        features.update({
-            'stock_log': np.log1p(stock),
-            'taux_utilisation': 0.5,
-            'pression_stock': 0.3
-        })
-        
-        return features
-    
     def _encode_material_id(self, material_id):
         """FIXED: Enhanced material ID encoding that handles string ObjectIds"""
         try:
             # If material_id is a string (MongoDB ObjectId), convert it to a numeric value
             if isinstance(material_id, str):
                 # Convert string to hash, then take modulo
-                import hashlib
-                # Create a hash of the string and convert to integer
-                hash_object = hashlib.md5(material_id.encode())
-                hex_dig = hash_object.hexdigest()
-                # Convert first 8 characters of hex to int, then modulo
-                numeric_id = int(hex_dig[:8], 16) % 1000
-                return numeric_id
+                return _id_hash(material_id) % 1000
             else:
-                # If it's already numeric, use modulo directly
-                return int(material_id) % 100
+                # Numeric IDs use the training encoding, falling back to a modulo
+                material_id_int = int(material_id)
+                return self._encoded_by_id.get(material_id_int, material_id_int % 100)
         except Exception as e:
             logger.warning(f"Error encoding material_id {material_id}: {e}")
             # Fallback to a default value
             return 1
     
     def _get_material_stock(self, material_id):
-        """Get enhanced stock information"""
-        if self.data is not None:
-            # Try to find stock data by matching the material_id
-            # Since material_id might be a string ObjectId, we need to handle this carefully
+        """Get enhanced stock information, memoized per material until the next training"""
+        try:
+            stock = self._stock_cache.get(material_id)
+        except TypeError:
+            # Unhashable IDs can't be cached
+            return self._lookup_material_stock(material_id)
+        
+        if stock is None:
+            if len(self._stock_cache) >= 4096:
+                self._stock_cache.clear()
+            stock = self._stock_cache[material_id] = self._lookup_material_stock(material_id)
+        return stock
+    
+    def _lookup_material_stock(self, material_id):
+        """Stock from the training data, or a stable default derived from the ID"""
+        if not isinstance(material_id, str):
+            # String ObjectIds never match the numeric training IDs
             try:
-                # First try direct matching if possible
-                if isinstance(material_id, str):
-                    # For string IDs, we can't directly match, so use a fallback
-                    pass
-                else:
-                    stock_data = self.data[self.data['materiel_id'] == material_id]['stock']
-                    if len(stock_data) > 0:
-                        return int(stock_data.iloc[0])
+                stock = self._stock_by_id.get(int(material_id))
+                if stock is not None:
+                    return stock
             except Exception as e:
                 logger.warning(f"Error getting stock for material_id {material_id}: {e}")
         
         # Default stock based on hash of material ID to be consistent
         try:
             if isinstance(material_id, str):
-                import hashlib
-                hash_object = hashlib.md5(material_id.encode())
-                hex_dig = hash_object.hexdigest()
-                # Use hash to determine stock level consistently
-                stock_level = (int(hex_dig[:4], 16) % 4) + 1
+                # Use the top 16 hash bits to determine stock level consistently
+                stock_level = ((_id_hash(material_id) >> 16) % 4) + 1
                 if stock_level == 1:
                     return 8
                 elif stock_level == 2:
@@ -678,51 +817,73 @@ class PlanningModel:
         except Exception:
             return 10  # Default fallback
     
-    def _generate_enhanced_recommendations(self, material_id, avg_demand, max_demand, min_demand, std_demand, daily_predictions):
+    def _scan_forecast(self, forecast):
+        """Compute every per-day aggregate the reports need in one place"""
+        demand = forecast['predicted_demand']
+        is_weekend = forecast['is_weekend']
+        
+        # Per-month means, ordered by each month's first appearance
+        _, first_seen, month_idx = np.unique(forecast['month'], return_index=True, return_inverse=True)
+        month_means = np.bincount(month_idx, weights=demand) / np.bincount(month_idx)
+        order = np.argsort(first_seen)
+        
+        # Weekend/weekday means only when both kinds of day are present
+        mixed = bool(is_weekend.any()) and not is_weekend.all()
+        
+        return ForecastScan(
+            days=len(demand),
+            low_count=int((demand <= 1).sum()),
+            peak_idx=int(demand.argmax()),
+            month_first_idx=first_seen[order],
+            month_means=month_means[order],
+            weekend_avg=float(demand[is_weekend].mean()) if mixed else None,
+            weekday_avg=float(demand[~is_weekend].mean()) if mixed else None
+        )
+    
+    def _generate_enhanced_recommendations(self, material_id, avg_demand, max_demand, min_demand, std_demand, scan):
         """Generate enhanced recommendations"""
         recommendations = []
         current_stock = self._get_material_stock(material_id)
         
         # Stock shortage warning
         if max_demand > current_stock:
-            recommendations.append({
-                'type': 'stock_shortage',
-                'priority': 'high',
-                'message': f"Peak demand ({int(max_demand)}) exceeds current stock ({current_stock}). Consider increasing inventory.",
-                'action': 'Increase stock or limit bookings during peak periods',
-                'impact': 'High risk of lost revenue'
-            })
+            recommendations.append(Recommendation(
+                type='stock_shortage',
+                priority='high',
+                message=f"Peak demand ({int(max_demand)}) exceeds current stock ({current_stock}). Consider increasing inventory.",
+                action='Increase stock or limit bookings during peak periods',
+                impact='High risk of lost revenue'
+            ))
         
         # High utilization warning
         if avg_demand > current_stock * 0.7:
-            recommendations.append({
-                'type': 'high_utilization',
-                'priority': 'medium',
-                'message': f"High utilization expected (avg: {avg_demand:.1f}/{current_stock})",
-                'action': 'Monitor availability closely and consider dynamic pricing',
-                'impact': 'Potential booking conflicts'
-            })
+            recommendations.append(Recommendation(
+                type='high_utilization',
+                priority='medium',
+                message=f"High utilization expected (avg: {avg_demand:.1f}/{current_stock})",
+                action='Monitor availability closely and consider dynamic pricing',
+                impact='Potential booking conflicts'
+            ))
         
         # Demand variability
         if std_demand > avg_demand * 0.5:
-            recommendations.append({
-                'type': 'variable_demand',
-                'priority': 'medium',
-                'message': f"High demand variability detected (std: {std_demand:.1f})",
-                'action': 'Implement flexible booking policies',
-                'impact': 'Unpredictable revenue streams'
-            })
+            recommendations.append(Recommendation(
+                type='variable_demand',
+                priority='medium',
+                message=f"High demand variability detected (std: {std_demand:.1f})",
+                action='Implement flexible booking policies',
+                impact='Unpredictable revenue streams'
+            ))
         
         # Low demand periods
-        low_demand_days = [d for d in daily_predictions if d['predicted_demand'] <= 1]
-        if len(low_demand_days) > len(daily_predictions) * 0.3:
-            recommendations.append({
-                'type': 'low_demand',
-                'priority': 'low',
-                'message': f"Low demand expected for {len(low_demand_days)} days",
-                'action': 'Consider maintenance, promotions, or alternative revenue streams',
-                'impact': 'Opportunity for equipment maintenance'
-            })
+        if scan.low_count > scan.days * 0.3:
+            recommendations.append(Recommendation(
+                type='low_demand',
+                priority='low',
+                message=f"Low demand expected for {scan.low_count} days",
+                action='Consider maintenance, promotions, or alternative revenue streams',
+                impact='Opportunity for equipment maintenance'
+            ))
         
         return recommendations
     
@@ -741,81 +902,46 @@ class PlanningModel:
     
     def _get_risk_description(self, risk_level):
         """Get risk description"""
-        descriptions = {
-            'low': 'Demand is well within capacity. Low risk of stockouts.',
-            'medium': 'Demand approaches capacity limits. Monitor closely.',
-            'high': 'High risk of stockouts. Immediate action required.'
-        }
-        return descriptions.get(risk_level, 'Unknown risk level')
+        return _RISK_DESCRIPTIONS.get(risk_level, 'Unknown risk level')
     
     def _get_season_name(self, month):
         """Get season name from month"""
-        seasons = {1: 'Winter', 2: 'Spring', 3: 'Summer', 4: 'Autumn'}
-        return seasons[self._get_season(month)]
+        return _SEASON_NAMES[month]
     
-    def _generate_insights(self, daily_predictions, avg_demand, max_demand):
-        """Generate actionable insights"""
+    def _generate_insights(self, forecast, scan, avg_demand):
+        """Generate actionable insights from the forecast aggregates"""
         insights = []
+        dates = forecast['date']
         
-        # Peak demand days
-        peak_days = [d for d in daily_predictions if d['predicted_demand'] == max_demand]
-        if peak_days:
-            peak_day = peak_days[0]
-            insights.append(f"Peak demand expected on {peak_day['date']} ({peak_day['day_of_week']})")
+        # Peak demand day (first maximum)
+        peak_date = dates[scan.peak_idx]
+        insights.append(f"Peak demand expected on {peak_date.strftime('%Y-%m-%d')} ({peak_date.strftime('%A')})")
         
         # Seasonal patterns
-        monthly_avg = {}
-        for pred in daily_predictions:
-            month = pred['month']
-            if month not in monthly_avg:
-                monthly_avg[month] = []
-            monthly_avg[month].append(pred['predicted_demand'])
-        
-        for month, demands in monthly_avg.items():
-            month_avg = np.mean(demands)
+        for first_idx, month_avg in zip(scan.month_first_idx, scan.month_means):
             if month_avg > avg_demand * 1.2:
-                insights.append(f"Higher than average demand expected in {month}")
+                insights.append(f"Higher than average demand expected in {dates[first_idx].strftime('%B')}")
         
         # Weekend vs weekday analysis
-        weekend_demands = [d['predicted_demand'] for d in daily_predictions if d['is_weekend']]
-        weekday_demands = [d['predicted_demand'] for d in daily_predictions if not d['is_weekend']]
-        
-        if weekend_demands and weekday_demands:
-            if np.mean(weekend_demands) > np.mean(weekday_demands) * 1.2:
+        if scan.weekend_avg is not None:
+            if scan.weekend_avg > scan.weekday_avg * 1.2:
                 insights.append("Significantly higher demand expected on weekends")
-            elif np.mean(weekday_demands) > np.mean(weekend_demands) * 1.2:
+            elif scan.weekday_avg > scan.weekend_avg * 1.2:
                 insights.append("Business/weekday bookings dominate this period")
         
         return insights
     
     def get_model_info(self):
         """Get enhanced model information"""
+        # Every field is built from native types, so no conversion walk is needed
         info = {
-            'is_trained': self.is_trained,
+            'is_trained': bool(self.is_trained),
             'accuracy': round(float(self.accuracy), 3) if self.accuracy else 0,
             'mae': round(float(self.mae), 3) if self.mae else 0,
-            'data_records': int(len(self.data)) if self.data is not None else 0,
+            'data_records': int(self.data_records),
             'features_count': len(self.feature_names),
-            'feature_names': self.feature_names,
-            'model_type': 'Enhanced RandomForestClassifier',
-            'hyperparameters': {
-                'n_estimators': 300,
-                'max_depth': 8,
-                'min_samples_split': 8,
-                'min_samples_leaf': 3,
-                'class_weight': 'balanced'
-            },
-            'enhancements': [
-                'temporal_feature_engineering',
-                'cyclical_encoding', 
-                'material_categorization',
-                'stock_pressure_analysis',
-                'seasonal_pattern_detection',
-                'risk_assessment',
-                'enhanced_recommendations',
-                'mongodb_objectid_support'
-            ],
-            'version': '2.0_enhanced'
+            'feature_names': self.feature_names
         }
+        info.update(self._STATIC_INFO)
         
-        return convert_to_json_serializable(info)
\ No newline at end of file
+        return info
\ No newline at end of file
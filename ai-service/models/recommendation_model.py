@@ -1,30 +1,101 @@
 import pandas as pd
 import numpy as np
 import spacy
+import torch
+import sklearn
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import re
+import importlib.util
 import logging
 import os
-from collections import Counter
+import hashlib
+import functools
+import joblib
+import threading
+import weakref
+from collections import Counter, OrderedDict, defaultdict
 import pickle
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+_EMBEDDER_MODEL = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+# Dynamically int8-quantized ONNX export of the encoder, run through ONNX
+# Runtime when it is installed (pip install "sentence-transformers[onnx]")
+_ONNX_RUNTIME = bool(importlib.util.find_spec('onnxruntime') and importlib.util.find_spec('optimum'))
+_ONNX_MODEL_FILE = 'onnx/model_qint8_avx512_vnni.onnx'
+
+# Bump when the config texts fed to the encoder change (enrichment, lemmas,
+# anything not covered by _embeddings_fingerprint) so saved embeddings are rebuilt
+_EMBEDDINGS_CACHE_VERSION = 1
+
+# PCA dimensions kept for the reduced config embeddings
+_PCA_COMPONENTS = 100
+
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\-àâäéèêëïîôöùûüÿç]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Number of processed queries whose final score vectors are kept
+_SCORE_CACHE_SIZE = 512
+
+# Words marking each budget level in a processed query (multi-word phrases
+# such as 'pas cher' are already mapped to 'low' by the synonyms)
+_BUDGET_WORDS = {
+    'low': frozenset({'low', 'faible', 'petit', 'économique', 'serré'}),
+    'medium': frozenset({'medium', 'moyen', 'normal', 'standard', 'correct'}),
+    'high': frozenset({'high', 'élevé', 'grand', 'cher', 'premium', 'luxe', 'haut'})
+}
+_LIEU_VALUES = ('intérieur', 'extérieur', 'studio')
+
+# Live model instances, whose locks are replaced in forked children
+_instances = weakref.WeakSet()
+
+def _reset_after_fork():
+    """Drop any lock a parent thread held at fork time"""
+    for model in _instances:
+        model._score_cache_lock = threading.Lock()
+        model._embedder_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _l2_normalize(vectors):
+    """Scale rows to unit length so cosine similarity reduces to a dot product.
+
+    The result is C-contiguous float32 so query scoring stays a single
+    single-precision BLAS matvec.
+    """
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.ascontiguousarray(vectors / np.maximum(norms, 1e-12), dtype=np.float32)
+
 class RecommendationModel:
+    # Queries at least this specific (see _extract_enhanced_features) skip the
+    # sentence encoder, provided some config shares a keyword with them
+    KEYWORD_ONLY_MIN_SPECIFICITY = 2
+    
     def __init__(self, data_path='models/data/'):
         self.data_path = data_path
         self.nlp = None
         self.embedder = None
+        self._embedder_backend = None
         self.configs = None
         self.prix_df = None
         self.config_embeddings = None
+        self.config_embeddings_norm = None
+        self.config_embeddings_pca_norm = None
         self.scaler = StandardScaler()
         self.pca = None
         self.is_initialized = False
+        self._recommendation_ids = {}
+        self._score_cache = OrderedDict()
+        self._score_cache_lock = threading.Lock()
+        self._embedder_lock = threading.Lock()
+        _instances.add(self)
+        self._embeddings_path = os.path.join(self.data_path, 'recommendation_embeddings.joblib')
         
         # Enhanced synonym mapping (from your working Colab version)
         self.SYNONYMS = {
@@ -57,6 +128,20 @@ class RecommendationModel:
             'son': 'audio', 'micro': 'audio', 'microphone': 'audio'
         }
         
+        # One alternation over every synonym (longest first) so the text is
+        # scanned once instead of once per entry
+        synonyms = sorted(self.SYNONYMS, key=len, reverse=True)
+        self._synonym_re = re.compile(r'\b(' + '|'.join(map(re.escape, synonyms)) + r')\b')
+        
+        # Reverse index: canonical value -> the synonyms that map to it
+        self._std_to_syns = defaultdict(set)
+        for syn, std in self.SYNONYMS.items():
+            self._std_to_syns[std].add(syn)
+        
+        # Memoized per instance: an lru_cache on the method itself would be one
+        # cache shared by every instance, keeping each of them alive through self
+        self._enhanced_preprocess_text = functools.lru_cache(maxsize=4096)(self._preprocess_text)
+        
         # Enhanced valid keywords (from your working model)
         self.MOTS_CLES_VALIDES = [
             'film', 'tournage', 'clip', 'pub', 'interview', 'court', 'métrage',
@@ -72,17 +157,25 @@ class RecommendationModel:
         try:
             logger.info("🤖 Initializing Enhanced Recommendation Model...")
             
+            with self._score_cache_lock:
+                self._score_cache.clear()
+            
             # Load NLP models
             self._load_nlp_models()
             
             # Load and process data
             self._load_enhanced_data()
             
-            # Pre-compute enhanced embeddings
-            self._precompute_enhanced_embeddings()
-            
-            # Setup advanced features
-            self._setup_advanced_features()
+            # Embeddings saved by a previous start on the same data skip the
+            # encoder entirely; it is then only loaded for the first semantic query
+            if not self._load_saved_embeddings():
+                # Pre-compute enhanced embeddings
+                self._precompute_enhanced_embeddings()
+                
+                # Setup advanced features
+                self._setup_advanced_features()
+                
+                self._save_embeddings()
             
             self.is_initialized = True
             logger.info("  Enhanced recommendation model initialized successfully")
@@ -97,23 +190,127 @@ class RecommendationModel:
         try:
             # Load French NLP model
             try:
-                self.nlp = spacy.load('fr_core_news_sm')
+                # Only the lemmas are used, so skip the parser and NER
+                self.nlp = spacy.load('fr_core_news_sm', disable=['parser', 'ner'])
                 logger.info("  French NLP model loaded")
             except OSError:
                 logger.warning("   French model not found. Using basic processing")
                 self.nlp = None
             
-            # Load the best multilingual embedding model
-            self.embedder = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-            
-            # Configure for better French understanding
-            self.embedder.max_seq_length = 512
-            logger.info("Enhanced embedding model loaded")
-            
         except Exception as e:
             logger.error(f"Error loading NLP models: {e}")
             raise
     
+    def _get_embedder(self):
+        """The multilingual sentence encoder, loaded on first use"""
+        if self.embedder is None:
+            with self._embedder_lock:
+                if self.embedder is None:
+                    embedder = self._load_embedder()
+                    
+                    # Configure for better French understanding
+                    embedder.max_seq_length = 512
+                    logger.info("Enhanced embedding model loaded")
+                    self.embedder = embedder
+        return self.embedder
+    
+    def _load_embedder(self):
+        """Quantized ONNX Runtime encoder when available, PyTorch otherwise"""
+        if _ONNX_RUNTIME:
+            try:
+                embedder = self._sentence_transformer(backend='onnx',
+                                                      model_kwargs={'file_name': _ONNX_MODEL_FILE})
+                logger.info("  Quantized ONNX embedding backend loaded")
+                self._embedder_backend = 'onnx'
+                return embedder
+            except Exception as e:
+                # sentence-transformers < 3.2 has no backend argument
+                logger.warning(f"   ONNX embedding backend unavailable, using PyTorch: {e}")
+        
+        embedder = self._sentence_transformer()
+        self._embedder_backend = 'torch'
+        return embedder
+    
+    def _sentence_transformer(self, **kwargs):
+        """Load the encoder from the local Hugging Face cache, using the Hub only on a cache miss
+        
+        Otherwise every boot makes a network round trip to check for updates,
+        and a bad network stalls it. _EMBEDDER_MODEL is pinned, so the cached
+        copy never needs revalidating.
+        """
+        try:
+            return SentenceTransformer(_EMBEDDER_MODEL, local_files_only=True, **kwargs)
+        except Exception as e:
+            # OSError when not downloaded yet, TypeError on old sentence-transformers
+            logger.info(f"   Embedding model not in local cache, downloading: {e}")
+            return SentenceTransformer(_EMBEDDER_MODEL, **kwargs)
+    
+    def _embeddings_fingerprint(self):
+        """Everything the saved embeddings depend on
+        
+        Code changes are covered by _EMBEDDINGS_CACHE_VERSION and the hash of
+        the preprocessing rules. The backend is the one that encoded the
+        configs, or before the encoder is loaded the one it will try first.
+        """
+        mtimes = []
+        for name in ('base_connaissances1.csv', 'prix_materiels_final.csv'):
+            path = os.path.join(self.data_path, name)
+            mtimes.append(os.path.getmtime(path) if os.path.exists(path) else None)
+        preprocessing = repr((_SPECIAL_CHARS_RE.pattern, _WHITESPACE_RE.pattern, sorted(self.SYNONYMS.items())))
+        return {
+            'cache_version': _EMBEDDINGS_CACHE_VERSION,
+            'csv_mtimes': mtimes,
+            'embedder_model': _EMBEDDER_MODEL,
+            'embedder_backend': self._embedder_backend or ('onnx' if _ONNX_RUNTIME else 'torch'),
+            'preprocessing': hashlib.blake2b(preprocessing.encode(), digest_size=16).hexdigest(),
+            'pca_components': _PCA_COMPONENTS,
+            'lemmatized': self.nlp is not None,
+            'sklearn_version': sklearn.__version__
+        }
+    
+    def _save_embeddings(self):
+        """Persist the config embeddings and PCA next to the data files"""
+        # Sample data is regenerated randomly on every start, don't pin it
+        if None in self._embeddings_fingerprint()['csv_mtimes']:
+            return
+        try:
+            joblib.dump({
+                'fingerprint': self._embeddings_fingerprint(),
+                'config_embeddings': self.config_embeddings,
+                'pca': self.pca,
+                'config_embeddings_pca': getattr(self, 'config_embeddings_pca', None)
+            }, self._embeddings_path, compress=3)
+            logger.info(f"Recommendation embeddings saved to {self._embeddings_path}")
+        except Exception as e:
+            logger.warning(f"Could not save recommendation embeddings: {e}")
+    
+    def _load_saved_embeddings(self):
+        """Restore saved embeddings if they were computed from the current data"""
+        if not os.path.exists(self._embeddings_path):
+            return False
+        try:
+            saved = joblib.load(self._embeddings_path)
+            if saved.get('fingerprint') != self._embeddings_fingerprint():
+                logger.info("Saved recommendation embeddings are stale, recomputing")
+                return False
+            
+            embeddings = saved['config_embeddings']
+            if len(embeddings) != len(self.configs):
+                return False
+            
+            self.config_embeddings = embeddings
+            self.config_embeddings_norm = np.ascontiguousarray(embeddings, dtype=np.float32)
+            self.pca = saved['pca']
+            if saved['config_embeddings_pca'] is not None:
+                self.config_embeddings_pca = saved['config_embeddings_pca']
+                self.config_embeddings_pca_norm = _l2_normalize(self.config_embeddings_pca)
+            
+            logger.info(f"Recommendation embeddings loaded from {self._embeddings_path}")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not load saved recommendation embeddings: {e}")
+            return False
+    
     def _load_enhanced_data(self):
         """Load and enhance the configuration data"""
         try:
@@ -208,48 +405,70 @@ class RecommendationModel:
         self.configs['lieu'] = self.configs['lieu'].str.lower().str.strip()
         
         # Create price dictionary for fast lookup
-        self.prix_dict = {}
-        for _, row in self.prix_df.iterrows():
-            key = (row['type'], row['materiel'])
-            self.prix_dict[key] = row['prix_location_par_jour']
+        self.prix_dict = dict(zip(
+            zip(self.prix_df['type'], self.prix_df['materiel']),
+            self.prix_df['prix_location_par_jour']
+        ))
         
         # Calculate enhanced pricing
-        self.configs['prix_jour'] = self.configs.apply(self._calculate_enhanced_prix, axis=1)
+        self.configs['prix_jour'] = self._calculate_enhanced_prix()
         
         # Add enhanced features
         self._add_enhanced_features()
         
+        # Pre-tokenize the keyword fields once for per-query Jaccard scoring
+        self._config_token_sets = [
+            frozenset(self._enhanced_preprocess_text(f"{t} {b} {l}").split())
+            for t, b, l in zip(self.configs['type'], self.configs['budget'], self.configs['lieu'])
+        ]
+        self._config_token_lens = np.array([len(tokens) for tokens in self._config_token_sets])
+        
+        # Flat column arrays and integer codes so the per-query paths never
+        # go through pandas row or string indexing
+        self._col = {column: self.configs[column].to_numpy() for column in (
+            'type', 'budget', 'lieu', 'camera', 'objectif', 'lumieres',
+            'prix_jour', 'complexity_score', 'budget_tier'
+        )}
+        self._codes = {}
+        self._code_of = {}
+        for column in ('type', 'budget', 'lieu'):
+            codes, values = pd.factorize(self.configs[column])
+            self._codes[column] = codes
+            self._code_of[column] = {value: code for code, value in enumerate(values)}
+        # (type, budget, lieu) codes per config for the diversity filter
+        self._combos = list(zip(self._codes['type'].tolist(), self._codes['budget'].tolist(),
+                                self._codes['lieu'].tolist()))
+        
+        # Equipment quality and price appropriateness only depend on the
+        # extracted budget, so their combined factor is precomputed per budget
+        quality_factor = 1 + (self._col['complexity_score'] / self._col['complexity_score'].max()) * 0.2
+        self._score_factors = {None: quality_factor}
+        for budget, budget_tier in {'low': 1, 'medium': 2, 'high': 3}.items():
+            price_scores = 1 - abs(self._col['budget_tier'] - budget_tier) / 3
+            self._score_factors[budget] = quality_factor * (0.8 + price_scores * 0.2)
+        
         logger.info(f"  Data cleaned and enhanced: {len(self.configs)} configurations ready")
     
-    def _calculate_enhanced_prix(self, config):
-        """Enhanced price calculation with fallbacks"""
-        try:
-            camera_price = self.prix_dict.get(('camera', config['camera']), 0)
-            objectif_price = self.prix_dict.get(('objectif', config['objectif']), 0)
-            lumieres_price = self.prix_dict.get(('lumieres', config['lumieres']), 0)
-            
-            total = camera_price + objectif_price + lumieres_price
-            
-            # Enhanced fallback pricing logic
-            if total == 0:
-                base_price = config.get('prix_estime', 300)
-                # Apply budget modifiers
-                if config['budget'] == 'low':
-                    return int(base_price * 0.7)
-                elif config['budget'] == 'high':
-                    return int(base_price * 1.4)
-                else:
-                    return int(base_price)
-            
-            return total
-            
-        except Exception:
-            return config.get('prix_estime', 300)
+    def _calculate_enhanced_prix(self):
+        """Enhanced price calculation with fallbacks, for every config at once"""
+        total = 0
+        for equipment in ('camera', 'objectif', 'lumieres'):
+            rows = self.prix_df[self.prix_df['type'] == equipment]
+            prices = pd.Series(rows['prix_location_par_jour'].to_numpy(), index=rows['materiel'])
+            prices = prices[~prices.index.duplicated(keep='last')]
+            total = total + self.configs[equipment].map(prices).fillna(0)
+        
+        # Enhanced fallback pricing logic: estimated price with budget modifiers
+        base_price = self.configs.get('prix_estime', 300)
+        modifier = self.configs['budget'].map({'low': 0.7, 'high': 1.4}).fillna(1.0)
+        fallback = np.trunc(base_price * modifier)
+        
+        return total.where(total != 0, fallback).astype('int64')
     
     def _add_enhanced_features(self):
         """Add enhanced features for better matching"""
         # Equipment complexity score
-        self.configs['complexity_score'] = self.configs.apply(self._calculate_complexity, axis=1)
+        self.configs['complexity_score'] = self._calculate_complexity()
         
         # Project difficulty score
         difficulty_map = {
@@ -268,25 +487,21 @@ class RecommendationModel:
         budget_tier = {'low': 1, 'medium': 2, 'high': 3}
         self.configs['budget_tier'] = self.configs['budget'].map(budget_tier).fillna(2)
     
-    def _calculate_complexity(self, row):
-        """Calculate equipment complexity score"""
-        score = 1
+    def _calculate_complexity(self):
+        """Calculate equipment complexity score for every config at once"""
+        camera = self.configs['camera']
         
         # Camera complexity
-        if 'FX6' in row['camera'] or 'C70' in row['camera']:
-            score += 2
-        elif 'R6' in row['camera'] or 'A7III' in row['camera']:
-            score += 1
+        score = np.where(camera.str.contains('FX6|C70'), 3,
+                         np.where(camera.str.contains('R6|A7III'), 2, 1))
         
         # Lens complexity
-        if 'L' in row['objectif'] or '2.8' in row['objectif']:
-            score += 1
+        score += self.configs['objectif'].str.contains(r'L|2\.8').to_numpy(dtype=int)
         
         # Light complexity
-        if 'Aputure' in row['lumieres'] or 'Arri' in row['lumieres']:
-            score += 1
+        score += self.configs['lumieres'].str.contains('Aputure|Arri').to_numpy(dtype=int)
         
-        return score
+        return pd.Series(score, index=self.configs.index)
     
     def _precompute_enhanced_embeddings(self):
         """Pre-compute enhanced embeddings with better text representation"""
@@ -313,21 +528,22 @@ class RecommendationModel:
                     text_parts.append('documentary filming natural lighting')
                 
                 full_text = ' '.join(text_parts)
-                processed_text = self._enhanced_preprocess_text(full_text)
-                config_texts.append(processed_text)
-            
-            # Compute embeddings in batches for efficiency
-            batch_size = 32
-            embeddings = []
-            
-            for i in range(0, len(config_texts), batch_size):
-                batch = config_texts[i:i + batch_size]
-                batch_embeddings = self.embedder.encode(batch, 
-                                                      convert_to_tensor=False,
-                                                      show_progress_bar=False)
-                embeddings.extend(batch_embeddings)
-            
-            self.config_embeddings = np.array(embeddings)
+                config_texts.append(self._enhanced_preprocess_text(full_text))
+            
+            config_texts = self._add_lemmas(config_texts)
+            
+            # Encode the whole corpus in one call: encode() sorts its input by
+            # length before batching, so batches carry little padding (slicing
+            # beforehand limited that sort to each arbitrary 32-text slice).
+            # Embeddings come back unit-norm, so cosine is a plain dot product
+            embedder = self._get_embedder()
+            with torch.inference_mode():
+                self.config_embeddings = embedder.encode(config_texts,
+                                                         batch_size=64,
+                                                         convert_to_numpy=True,
+                                                         normalize_embeddings=True,
+                                                         show_progress_bar=False)
+            self.config_embeddings_norm = np.ascontiguousarray(self.config_embeddings, dtype=np.float32)
             logger.info("  Enhanced configuration embeddings pre-computed")
             
         except Exception as e:
@@ -339,42 +555,52 @@ class RecommendationModel:
         try:
             # Apply PCA to reduce embedding dimensions and improve performance
             if self.config_embeddings is not None:
-                self.pca = PCA(n_components=min(100, self.config_embeddings.shape[1]))
+                self.pca = PCA(n_components=min(_PCA_COMPONENTS, self.config_embeddings.shape[1]))
                 self.config_embeddings_pca = self.pca.fit_transform(self.config_embeddings)
+                self.config_embeddings_pca_norm = _l2_normalize(self.config_embeddings_pca)
                 logger.info("  PCA dimensionality reduction applied")
             
         except Exception as e:
             logger.warning(f"   Advanced features setup failed: {e}")
     
-    def _enhanced_preprocess_text(self, text):
-        """Enhanced text preprocessing with better French handling"""
+    def _preprocess_text(self, text):
+        """Enhanced text preprocessing with better French handling
+        
+        Called through the memoized self._enhanced_preprocess_text.
+        """
         if not isinstance(text, str) or not text.strip():
             return ""
 
         text = text.lower().strip()
         
         # Remove special characters but keep accents and hyphens
-        text = re.sub(r'[^\w\s\-àâäéèêëïîôöùûüÿç]', ' ', text)
+        text = _SPECIAL_CHARS_RE.sub(' ', text)
         
         # Apply enhanced synonym replacement
-        for syn, std in self.SYNONYMS.items():
-            text = re.sub(r'\b' + re.escape(syn) + r'\b', std, text)
+        text = self._synonym_re.sub(lambda m: self.SYNONYMS[m.group(1)], text)
         
         # Normalize spaces
-        text = re.sub(r'\s+', ' ', text).strip()
+        return _WHITESPACE_RE.sub(' ', text).strip()
+    
+    def _add_lemmas(self, texts):
+        """French-specific enhancement: append spaCy lemmas to preprocessed texts
         
-        # French-specific enhancements
-        if self.nlp:
-            try:
-                doc = self.nlp(text)
+        Runs once over the config corpus through nlp.pipe; queries skip it, as
+        lemmas barely change the ranking of short queries.
+        """
+        if not self.nlp:
+            return texts
+        
+        try:
+            enhanced = []
+            for text, doc in zip(texts, self.nlp.pipe(texts, batch_size=256)):
                 # Extract lemmas for better matching
                 lemmas = [token.lemma_ for token in doc if not token.is_stop and not token.is_punct]
-                if lemmas:
-                    text = text + ' ' + ' '.join(lemmas)
-            except:
-                pass
-        
-        return text
+                enhanced.append(text + ' ' + ' '.join(lemmas) if lemmas else text)
+            return enhanced
+        except Exception as e:
+            logger.warning(f"   Lemmatization skipped: {e}")
+            return texts
     
     def _extract_enhanced_features(self, query):
         """Enhanced feature extraction with better accuracy"""
@@ -382,9 +608,7 @@ class RecommendationModel:
         words = set(processed_query.split())
         
         # Define enhanced canonical values
-        BUDGET_VALUES = {'low', 'medium', 'high'}
-        LIEU_VALUES = {'intérieur', 'extérieur', 'studio'}
-        TYPE_VALUES = set(self.configs['type'].unique())
+        TYPE_VALUES = self._code_of['type']
         
         # Enhanced extraction with context understanding
         features = {
@@ -395,21 +619,15 @@ class RecommendationModel:
         }
         
         # Budget detection with context
-        budget_patterns = {
-            'low': ['low', 'faible', 'petit', 'économique', 'pas cher', 'serré'],
-            'medium': ['medium', 'moyen', 'normal', 'standard', 'correct'],
-            'high': ['high', 'élevé', 'grand', 'cher', 'premium', 'luxe', 'haut']
-        }
-        
-        for budget, patterns in budget_patterns.items():
-            if any(pattern in processed_query for pattern in patterns):
+        for budget, budget_words in _BUDGET_WORDS.items():
+            if not words.isdisjoint(budget_words):
                 features['budget'] = budget
                 features['specificity_score'] += 1
                 break
         
         # Location detection
-        for lieu in LIEU_VALUES:
-            if lieu in words or any(syn in words for syn, std in self.SYNONYMS.items() if std == lieu):
+        for lieu in _LIEU_VALUES:
+            if lieu in words or not words.isdisjoint(self._std_to_syns[lieu]):
                 features['lieu'] = lieu
                 features['specificity_score'] += 1
                 break
@@ -433,87 +651,112 @@ class RecommendationModel:
         return features
     
     def _calculate_enhanced_scores(self, query):
-        """Enhanced scoring algorithm matching your Colab performance"""
+        """Enhanced scoring algorithm matching your Colab performance
+        
+        Returns the normalized score per config and the features extracted
+        from the query, so callers don't have to extract them again.
+        """
         try:
             processed_query = self._enhanced_preprocess_text(query)
             
             if not processed_query:
-                return np.zeros(len(self.configs))
-            
-            # 1. Semantic similarity with enhanced embeddings
-            query_embedding = self.embedder.encode([processed_query])
+                return np.zeros(len(self.configs)), self._extract_enhanced_features(processed_query)
             
-            # Use PCA embeddings if available for better performance
-            if hasattr(self, 'config_embeddings_pca'):
-                query_pca = self.pca.transform(query_embedding)
-                semantic_scores = cosine_similarity(query_pca, self.config_embeddings_pca)[0]
-            else:
-                semantic_scores = cosine_similarity(query_embedding, self.config_embeddings)[0]
+            # Repeated queries reuse the scores and features computed the first time
+            with self._score_cache_lock:
+                cached = self._score_cache.get(processed_query)
+                if cached is not None:
+                    self._score_cache.move_to_end(processed_query)
+                    return cached
             
-            # 2. Enhanced keyword matching with TF-IDF like scoring
-            query_words = set(processed_query.split())
-            keyword_scores = []
+            extracted = self._extract_enhanced_features(processed_query)
+            query_words = frozenset(processed_query.split())
             
-            for _, row in self.configs.iterrows():
-                config_text = self._enhanced_preprocess_text(f"{row['type']} {row['budget']} {row['lieu']}")
-                config_words = set(config_text.split())
-                
-                # Enhanced Jaccard with term frequency weighting
-                intersection = len(query_words.intersection(config_words))
-                union = len(query_words.union(config_words))
-                
-                # Bonus for exact term matches
-                exact_matches = sum(1 for word in query_words if word in config_words)
-                jaccard = intersection / union if union > 0 else 0
-                
-                # Weighted score
-                keyword_score = jaccard + (exact_matches * 0.1)
-                keyword_scores.append(keyword_score)
+            # 1. Enhanced keyword matching with TF-IDF like scoring
+            intersection = np.fromiter(
+                (len(query_words & config_words) for config_words in self._config_token_sets),
+                dtype=np.int32, count=len(self._config_token_sets)
+            )
+            union = len(query_words) + self._config_token_lens - intersection
             
-            keyword_scores = np.array(keyword_scores)
+            # Enhanced Jaccard plus a bonus per exact term match
+            keyword_scores = intersection / np.maximum(union, 1) + intersection * 0.1
             
-            # 3. Feature-based boosting (enhanced)
-            extracted = self._extract_enhanced_features(processed_query)
+            # 2. Feature-based boosting (enhanced)
             boosts = np.ones(len(self.configs))
             
             # Dynamic boosting based on feature specificity
             boost_strength = 0.3 + (extracted['specificity_score'] * 0.1)
             
-            if extracted['type']:
-                type_match = (self.configs['type'] == extracted['type']).astype(float)
-                boosts += boost_strength * type_match
-            
-            if extracted['budget']:
-                budget_match = (self.configs['budget'] == extracted['budget']).astype(float)
-                boosts += boost_strength * budget_match
-            
-            if extracted['lieu']:
-                lieu_match = (self.configs['lieu'] == extracted['lieu']).astype(float)
-                boosts += boost_strength * lieu_match
-            
-            # 4. Equipment quality scoring
-            quality_scores = self.configs['complexity_score'].values / self.configs['complexity_score'].max()
-            
-            # 5. Price appropriateness scoring
-            if extracted['budget']:
-                budget_tier = {'low': 1, 'medium': 2, 'high': 3}[extracted['budget']]
-                price_scores = 1 - abs(self.configs['budget_tier'].values - budget_tier) / 3
+            for feature in ('type', 'budget', 'lieu'):
+                if extracted[feature]:
+                    code = self._code_of[feature].get(extracted[feature], -1)
+                    boosts += boost_strength * (self._codes[feature] == code)
+            
+            # 3. Combined scoring with weights optimized from your Colab version.
+            # Specific queries that match config keywords are ranked by keywords
+            # alone: the encoder forward pass barely moves their ranking. Without
+            # a keyword match only the encoder can tell the configs apart
+            if (extracted['specificity_score'] >= self.KEYWORD_ONLY_MIN_SPECIFICITY
+                    and keyword_scores.max() > 0):
+                logger.debug(f"Keyword-only scoring for '{processed_query}'")
+                base_scores = keyword_scores * 0.6
             else:
-                price_scores = np.ones(len(self.configs))
+                logger.debug(f"Semantic scoring for '{processed_query}'")
+                semantic_scores = self._semantic_scores(processed_query)
+                base_scores = (semantic_scores * 0.4) + (keyword_scores * 0.3)
             
-            # 6. Combined scoring with weights optimized from your Colab version
-            base_scores = (semantic_scores * 0.4) + (keyword_scores * 0.3)
-            final_scores = base_scores * boosts * (1 + quality_scores * 0.2) * (0.8 + price_scores * 0.2)
+            # 4. Equipment quality and price appropriateness, applied in place
+            final_scores = base_scores
+            final_scores *= boosts
+            final_scores *= self._score_factors[extracted['budget']]
             
             # Normalize scores
-            if final_scores.max() > 0:
-                final_scores = final_scores / final_scores.max()
+            max_score = final_scores.max()
+            if max_score > 0:
+                final_scores /= max_score
+            
+            # Cached arrays are shared between requests, so freeze them
+            final_scores.flags.writeable = False
+            with self._score_cache_lock:
+                self._score_cache[processed_query] = (final_scores, extracted)
+                if len(self._score_cache) > _SCORE_CACHE_SIZE:
+                    self._score_cache.popitem(last=False)
             
-            return final_scores
+            return final_scores, extracted
             
         except Exception as e:
             logger.error(f"  Error calculating enhanced scores: {e}")
-            return np.random.uniform(0.1, 0.3, len(self.configs))
+            return (np.random.uniform(0.1, 0.3, len(self.configs)),
+                    {'budget': None, 'lieu': None, 'type': None, 'specificity_score': 0})
+    
+    def _semantic_scores(self, processed_query):
+        """Cosine similarity between the query and every config embedding
+        
+        None if the encoder can't be loaded, so the query falls back to
+        keyword scoring.
+        """
+        try:
+            embedder = self._get_embedder()
+        except Exception as e:
+            logger.warning(f"   Embedding model unavailable, scoring by keywords only: {e}")
+            return None
+        
+        with torch.inference_mode():
+            query_embedding = embedder.encode([processed_query],
+                                              convert_to_numpy=True,
+                                              normalize_embeddings=True,
+                                              show_progress_bar=False)
+        
+        # Use PCA embeddings if available for better performance; the
+        # corpus side is normalized once at init, so cosine is one matvec
+        # (the PCA projection is not unit-norm, hence the query rescale)
+        if self.config_embeddings_pca_norm is not None:
+            q, corpus = self.pca.transform(query_embedding)[0], self.config_embeddings_pca_norm
+        else:
+            q, corpus = query_embedding[0], self.config_embeddings_norm
+        q = q.astype(np.float32, copy=False)
+        return corpus @ (q / max(np.sqrt(np.vdot(q, q)), 1e-12))
     
     def get_recommendations(self, user_query, jours=1):
         """Get enhanced equipment recommendations matching Colab quality"""
@@ -531,50 +774,29 @@ class RecommendationModel:
                 }
             
             # Calculate enhanced scores
-            similarities = self._calculate_enhanced_scores(user_query)
-            top_indices = similarities.argsort()[::-1]
+            similarities, extracted = self._calculate_enhanced_scores(user_query)
             
             # Build diverse, high-quality results
-            results = []
-            seen_combinations = set()
-            quality_threshold = 0.15  # Lower threshold for better recall
+            top_indices = self._select_diverse(similarities, quality_threshold=0.15)
             
+            results = []
+            col = self._col
             for idx in top_indices:
-                if len(results) >= 5:
-                    break
-                
-                row = self.configs.iloc[idx]
-                
-                # Ensure variety while maintaining quality
-                combo_key = (row['type'], row['budget'], row['lieu'])
-                
-                # Allow some similarity but avoid exact duplicates
-                similar_count = sum(1 for seen in seen_combinations 
-                                  if sum(a == b for a, b in zip(combo_key, seen)) >= 2)
-                
-                if similar_count >= 2:  # Max 2 similar configurations
-                    continue
-                
-                seen_combinations.add(combo_key)
-                
-                # Quality threshold check
-                if similarities[idx] < quality_threshold:
-                    continue
-                
                 # Create enhanced result
                 result = {
-                    'type': row['type'],
-                    'budget': row['budget'],
-                    'lieu': row['lieu'],
-                    'camera': row['camera'],
-                    'objectif': row['objectif'],
-                    'lumieres': row['lumieres'],
-                    'prix_jour': int(row['prix_jour']),
-                    'prix_total': int(row['prix_jour'] * jours),
+                    'id': self._get_recommendation_id(col['camera'][idx]),
+                    'type': col['type'][idx],
+                    'budget': col['budget'][idx],
+                    'lieu': col['lieu'][idx],
+                    'camera': col['camera'][idx],
+                    'objectif': col['objectif'][idx],
+                    'lumieres': col['lumieres'][idx],
+                    'prix_jour': int(col['prix_jour'][idx]),
+                    'prix_total': int(col['prix_jour'][idx] * jours),
                     'duree': jours,
                     'score': round(similarities[idx], 3),
                     'confidence': self._calculate_confidence(similarities[idx]),
-                    'complexity_score': row['complexity_score'],
+                    'complexity_score': int(col['complexity_score'][idx]),
                     'quality_rating': min(5, round(similarities[idx] * 5 + 1))
                 }
                 results.append(result)
@@ -588,7 +810,7 @@ class RecommendationModel:
                 'query': user_query,
                 'duration_days': jours,
                 'recommendations': results,
-                'extracted_features': self._extract_enhanced_features(user_query),
+                'extracted_features': extracted,
                 'model_confidence': np.mean([r['score'] for r in results]) if results else 0
             }
             
@@ -600,6 +822,57 @@ class RecommendationModel:
                 'recommendations': []
             }
     
+    def _select_diverse(self, similarities, quality_threshold, limit=5):
+        """Indices of the best configs, skipping near-duplicate combinations
+        
+        Configs are walked by descending score; one is skipped when at least
+        two distinct (type, budget, lieu) combinations already taken share two
+        of its three values, counted through per-pair tallies instead of a scan
+        of everything taken. Only the top slice of scores is ordered; the slice
+        grows when the filter leaves it short of results.
+        """
+        pool = 20
+        while True:
+            k = min(pool, len(similarities))
+            # Everything scoring at least the k-th best, so a run of tied
+            # scores is never split at the slice boundary
+            kth_score = similarities[np.argpartition(-similarities, k - 1)[k - 1]]
+            part = np.flatnonzero(similarities >= kth_score)[::-1]
+            # Ties in descending corpus order, as the original argsort()[::-1] walk
+            order = part[np.argsort(-similarities[part], kind='stable')]
+            
+            selected = []
+            seen = set()
+            # How many distinct combinations taken so far have each pair of
+            # values: two combinations share two values iff they share a pair
+            pairs = Counter()
+            for idx in order.tolist():
+                if similarities[idx] < quality_threshold:
+                    return selected
+                t, b, l = combo = self._combos[idx]
+                # A taken combination equal to this one shares all three pairs
+                similar_count = pairs[0, t, b] + pairs[1, t, l] + pairs[2, b, l] - 2 * (combo in seen)
+                if similar_count >= 2:
+                    continue
+                if combo not in seen:
+                    seen.add(combo)
+                    pairs.update(((0, t, b), (1, t, l), (2, b, l)))
+                selected.append(idx)
+                if len(selected) == limit:
+                    return selected
+            
+            if len(part) == len(similarities):
+                return selected
+            pool *= 4
+    
+    def _get_recommendation_id(self, camera):
+        """Stable recommendation ID derived from the camera name (memoized)"""
+        rec_id = self._recommendation_ids.get(camera)
+        if rec_id is None:
+            rec_id = f"rec_{hashlib.blake2b(camera.encode(), digest_size=6).hexdigest()}"
+            self._recommendation_ids[camera] = rec_id
+        return rec_id
+    
     def _calculate_confidence(self, score):
         """Calculate confidence level based on score"""
         if score > 0.8:
@@ -681,7 +954,7 @@ class RecommendationModel:
         """Get enhanced model information"""
         return {
             'is_initialized': self.is_initialized,
-            'embedder_model': 'paraphrase-multilingual-MiniLM-L12-v2',
+            'embedder_model': _EMBEDDER_MODEL,
             'nlp_model': 'fr_core_news_sm' if self.nlp else 'basic_processing',
             'data_records': len(self.configs) if self.configs is not None else 0,
             'features': [
@@ -4,61 +4,264 @@ Startup script for AI Service
 """
 import os
 import sys
+import argparse
+import functools
 import logging
+import signal
+import socket
+import time
+from dataclasses import dataclass
 from pathlib import Path
 
 # Add the current directory to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app import app, initialize_models
-from config import config
+import logging_setup
+from logging_setup import stop_logging
+
+@dataclass(frozen=True)
+class EnvSnapshot:
+    """Startup settings taken from the environment"""
+    __slots__ = ('log_level', 'log_file', 'flask_env', 'warmup', 'threads', 'cpu_list', 'numa_node')
+    log_level: int
+    log_file: str
+    flask_env: str
+    warmup: bool
+    threads: int  # waitress worker threads per process (AI_THREADS)
+    cpu_list: str  # CPUs to pin the service to, e.g. "0-15" (AI_CPU_LIST)
+    numa_node: str  # NUMA node to run on, needs libnuma (AI_NUMA_NODE)
+
+@functools.lru_cache(maxsize=1)
+def _env():
+    """Read the environment once; nothing changes it after boot"""
+    return EnvSnapshot(
+        log_level=getattr(logging, os.environ.get('LOG_LEVEL', 'INFO').upper()),
+        log_file=os.environ.get('LOG_FILE', 'ai_service.log'),
+        flask_env=os.environ.get('FLASK_ENV', 'development'),
+        warmup=os.environ.get('AI_WARMUP') == '1',
+        threads=int(os.environ.get('AI_THREADS', os.cpu_count() or 4)),
+        cpu_list=os.environ.get('AI_CPU_LIST', ''),
+        numa_node=os.environ.get('AI_NUMA_NODE', '')
+    )
+
+@functools.lru_cache(maxsize=4)
+def _resolve_config(name):
+    """Config class for a FLASK_ENV name, falling back to the default one"""
+    from config import config
+    return config.get(name, config['default'])
 
 def setup_logging():
-    """Setup logging configuration"""
-    log_level = os.environ.get('LOG_LEVEL', 'INFO')
-    log_file = os.environ.get('LOG_FILE', 'ai_service.log')
+    """Setup logging configuration (production logs to the file only)"""
+    logging_setup.setup_logging(_env().log_file, level=_env().log_level,
+                                console=_env().flask_env != 'production')
+    if _env().flask_env == 'production' and _env().log_level >= logging.WARNING:
+        # Short-circuits INFO/DEBUG calls before any LogRecord is built
+        logging.disable(logging.INFO)
+
+def parse_cpu_list(cpu_list):
+    """Parse a cpuset-style list such as "0-3,8,10-11" into a set of CPU ids"""
+    cpus = set()
+    for part in cpu_list.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+def pin_process():
+    """Pin the service to AI_CPU_LIST and AI_NUMA_NODE before the models load
     
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    Threads created afterwards (torch's intra-op pool, the server workers)
+    inherit the mask, so they are not migrated across NUMA nodes.
+    """
+    logger = logging.getLogger(__name__)
+    
+    if _env().numa_node:
+        try:
+            import ctypes
+            libnuma = ctypes.CDLL('libnuma.so.1')
+            if libnuma.numa_available() < 0 or libnuma.numa_run_on_node(int(_env().numa_node)) != 0:
+                raise OSError(f"cannot run on NUMA node {_env().numa_node}")
+        except (OSError, ValueError) as e:
+            logger.warning("  NUMA pinning skipped: %s", e)
+    
+    if _env().cpu_list:
+        if not hasattr(os, 'sched_setaffinity'):
+            logger.warning("  AI_CPU_LIST ignored: CPU affinity is not supported on this platform")
+            return
+        try:
+            os.sched_setaffinity(0, parse_cpu_list(_env().cpu_list))
+        except (OSError, ValueError) as e:
+            logger.warning("  CPU pinning skipped: %s", e)
+    
+    if (_env().cpu_list or _env().numa_node) and hasattr(os, 'sched_getaffinity'):
+        logger.info("📌 Running on CPUs %s", sorted(os.sched_getaffinity(0)))
 
-def main():
+# Representative inputs: the query is long and generic enough to go through the sentence encoder
+WARMUP_QUERY = "matériel pour un événement en extérieur avec beaucoup d'invités"
+WARMUP_MATERIAL_ID = 'warmup'
+
+def warmup():
+    """Run each model once so the first real request finds them loaded and warm"""
+    from app import get_recommendation_model, get_planning_model
+    
+    logger = logging.getLogger(__name__)
+    start = time.perf_counter()
+    get_recommendation_model().get_recommendations(WARMUP_QUERY, 2)
+    logger.info("🔥 Recommendation model warmed up in %.2fs", time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    planning_model = get_planning_model()
+    if planning_model is not None:
+        planning_model.predict_demand(WARMUP_MATERIAL_ID, '2024-06-01', '2024-06-07')
+    logger.info("🔥 Planning model warmed up in %.2fs", time.perf_counter() - start)
+
+def run_server(app, app_config, listen_socket=None):
+    """Serve with Werkzeug in debug mode and with waitress otherwise
+    
+    listen_socket, if given, is an already bound socket to accept on.
+    """
+    if app_config.DEBUG:
+        if listen_socket is None:
+            app.run(host=app_config.HOST, port=app_config.PORT, debug=True)
+        else:
+            from werkzeug.serving import make_server
+            make_server(app_config.HOST, app_config.PORT, app, threaded=True,
+                        fd=listen_socket.fileno()).serve_forever()
+        return
+    
+    from waitress import serve
+    if listen_socket is None:
+        serve(app, host=app_config.HOST, port=app_config.PORT, threads=_env().threads)
+    else:
+        serve(app, sockets=[listen_socket], threads=_env().threads)
+
+def serve_zygote(app, app_config, workers, worker_init):
+    """Serve the app from `workers` processes forked from this one
+    
+    The children share the imported libraries copy-on-write, run
+    worker_init() (which loads the models) and accept connections on one
+    inherited listening socket. Returns False if any worker exited with an error.
+    """
+    logger = logging.getLogger(__name__)
+    listen_socket = socket.create_server((app_config.HOST, app_config.PORT), backlog=128)
+    children = []
+    all_clean = True
+    try:
+        for _ in range(workers):
+            pid = os.fork()
+            if pid == 0:
+                # SIGTERM from the parent shuts the worker down like Ctrl+C
+                signal.signal(signal.SIGTERM, signal.default_int_handler)
+                status = 0
+                try:
+                    worker_init()
+                    run_server(app, app_config, listen_socket)
+                except KeyboardInterrupt:
+                    pass
+                except BaseException:
+                    logger.exception("  Worker %d failed", os.getpid())
+                    status = 1
+                finally:
+                    stop_logging()
+                    os._exit(status)
+            children.append(pid)
+        
+        logger.info("🧬 Forked %d workers", workers)
+        for pid in children:
+            _, wait_status = os.waitpid(pid, 0)
+            exit_code = os.waitstatus_to_exitcode(wait_status)
+            if exit_code != 0:
+                logger.error("  Worker %d exited with status %d", pid, exit_code)
+                all_clean = False
+    except BaseException:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        raise
+    finally:
+        listen_socket.close()
+    return all_clean
+
+def warm_up_models():
+    """Run warmup() if AI_WARMUP is on; a failure only costs the first requests time"""
+    if _env().warmup:
+        try:
+            warmup()
+        except Exception as e:
+            logging.getLogger(__name__).warning("  Model warmup failed: %s", e)
+
+def init_worker():
+    """Load the models saved by prime_model_cache() in a freshly forked worker"""
+    from app import initialize_models
+    
+    if not initialize_models(eager=True):
+        raise RuntimeError("model initialization failed")
+    warm_up_models()
+
+def exit_now(status):
+    """Exit right after flushing the logs, skipping interpreter teardown
+    
+    Module finalization and torch's destructors only delay a supervised
+    restart, and nothing else needs saving before the server is up.
+    """
+    stop_logging()
+    os._exit(status)
+
+def main(argv=None):
     """Main startup function"""
+    parser = argparse.ArgumentParser(description='Start the AI service')
+    parser.add_argument('--zygote', type=int, default=0, metavar='N',
+                        help='train the models once, then fork N worker processes that load them (POSIX only)')
+    args = parser.parse_args(argv)
+    
+    # Bound before anything can fail, so the handlers below always have it
+    logger = logging.getLogger(__name__)
     try:
         # Setup logging
         setup_logging()
-        logger = logging.getLogger(__name__)
+        pin_process()
         
         # Get configuration
-        config_name = os.environ.get('FLASK_ENV', 'development')
-        app_config = config.get(config_name, config['default'])
+        config_name = _env().flask_env
+        app_config = _resolve_config(config_name)
         
-        logger.info(f"🚀 Starting AI Service in {config_name} mode")
+        logger.info("🚀 Starting AI Service in %s mode", config_name)
         
-        # Initialize models
+        # Initialize models (app pulls in Flask and the ML stack, so import it only now)
+        from app import app, initialize_models, prime_model_cache
         logger.info("🤖 Initializing AI models...")
-        if not initialize_models():
+        zygote = args.zygote > 0 and hasattr(os, 'fork')
+        if args.zygote and not zygote:
+            logger.warning("--zygote needs os.fork, serving from a single process")
+        
+        # Workers forked from a process that ran OpenMP code would hang, so with
+        # --zygote the models are trained and saved in a child and every worker
+        # loads them after the fork
+        if not (prime_model_cache() if zygote else initialize_models()):
             logger.error("  Failed to initialize models")
-            sys.exit(1)
+            exit_now(1)
+        
+        if not zygote:
+            warm_up_models()
         
         # Start the Flask app
-        logger.info(f"🌐 Starting Flask app on {app_config.HOST}:{app_config.PORT}")
-        app.run(
-            host=app_config.HOST,
-            port=app_config.PORT,
-            debug=app_config.DEBUG
-        )
+        logger.info("🌐 Starting Flask app on %s:%s", app_config.HOST, app_config.PORT)
+        if zygote:
+            if not serve_zygote(app, app_config, args.zygote, init_worker):
+                exit_now(1)
+        else:
+            run_server(app, app_config)
         
     except KeyboardInterrupt:
         logger.info("🛑 Service stopped by user")
+        stop_logging()
     except Exception as e:
-        logger.error(f"  Failed to start AI service: {e}")
-        sys.exit(1)
+        logger.error("  Failed to start AI service: %s", e)
+        exit_now(1)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Forked workers must be able to run the planning model
+
+libgomp's thread pool does not survive fork: a child whose parent already ran
+OpenMP code (HistGradientBoosting) hangs on its first prediction. The zygote
+and gunicorn startups therefore train in a throwaway child and let every
+worker load the saved model; this checks that such a worker predicts.
+"""
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+# More than one OpenMP thread, or the hang never shows up on a single-CPU machine
+os.environ.setdefault('OMP_NUM_THREADS', '4')
+
+import pytest
+
+for module in ('spacy', 'torch', 'sentence_transformers'):
+    pytest.importorskip(module)
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVICE_DIR))
+
+from models.planning_model import PlanningModel
+
+FORK_TIMEOUT = 120
+
+def run_forked(target, timeout=FORK_TIMEOUT):
+    """Run target() in a forked child and return its exit code, killing it after timeout"""
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            status = 0 if target() else 1
+        finally:
+            os._exit(status)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        done, wait_status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return os.waitstatus_to_exitcode(wait_status)
+        time.sleep(0.1)
+    os.kill(pid, 9)
+    os.waitpid(pid, 0)
+    pytest.fail(f"forked child did not finish within {timeout}s")
+
+@pytest.fixture
+def data_path(tmp_path):
+    """A copy of the planning CSVs, so the saved model lands in a scratch directory"""
+    for name in ('reservations_3000.csv', 'materiel_corrige_final.csv'):
+        shutil.copy(SERVICE_DIR / 'models' / 'data' / name, tmp_path / name)
+    return str(tmp_path) + os.sep
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs os.fork")
+def test_worker_predicts_after_training_in_a_child(data_path):
+    # What prime_model_cache() does: train and save without touching OpenMP here
+    assert run_forked(lambda: PlanningModel(data_path).load_and_train()) == 0
+    assert os.path.exists(os.path.join(data_path, 'planning_model.joblib'))
+
+    def worker():
+        model = PlanningModel(data_path)
+        if not model.load_and_train():
+            return False
+        prediction = model.predict_demand('1', '2024-06-01', '2024-06-07')
+        return len(prediction['daily_predictions']) == 7
+
+    assert run_forked(worker) == 0
@@ -0,0 +1,37 @@
+"""
+Recommendation model regressions
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+for module in ('spacy', 'torch', 'sentence_transformers'):
+    pytest.importorskip(module)
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVICE_DIR))
+
+from models.recommendation_model import RecommendationModel
+
+@pytest.fixture(scope='module')
+def model(tmp_path_factory):
+    """A model initialized on a copy of the real data, so saved embeddings stay out of the repo"""
+    data_path = tmp_path_factory.mktemp('data')
+    for name in ('base_connaissances1.csv', 'prix_materiels_final.csv'):
+        shutil.copy(SERVICE_DIR / 'models' / 'data' / name, data_path / name)
+    model = RecommendationModel(str(data_path) + os.sep)
+    assert model.initialize()
+    return model
+
+# Short queries naming no type, budget or location: before the fix they were
+# ranked by keywords alone, scored zero everywhere and got no results
+@pytest.mark.parametrize('query', [
+    'mariage photo', 'drone', 'wedding photos', 'caméra sony 4k', 'tournage vidéo entreprise'
+])
+def test_short_unspecific_query_gets_recommendations(model, query):
+    result = model.get_recommendations(query, 1)
+    assert result['success']
+    assert len(result['recommendations']) == 5
@@ -0,0 +1,26 @@
+"""
+WSGI entrypoint for production servers
+
+    gunicorn -w 4 -k gthread --threads 4 -b 0.0.0.0:5001 wsgi:app
+
+Don't add --preload: workers forked from a master that has run OpenMP code
+(HistGradientBoosting, torch) hang on their first prediction.
+
+On Windows, where gunicorn is not available, use waitress instead:
+
+    waitress-serve --port=5001 --threads=16 wsgi:app
+
+bjoern (``bjoern.run(app, '0.0.0.0', 5001)``) also works with this module.
+"""
+from config import Config
+from logging_setup import setup_logging
+
+# Before app is imported, so every record goes through the shared queue listener
+setup_logging(Config.LOG_FILE, file_level=Config.LOG_LEVEL.upper())
+
+from app import app, initialize_models
+
+# Each worker imports this module itself; load both models before serving
+if not initialize_models(eager=True):
+    import logging
+    logging.getLogger(__name__).error("Failed to initialize models properly")